@@ -0,0 +1,71 @@
+"""Benchmark generate_static_html.collect_data against table count and history length.
+
+Builds synthetic db_monitoring.sqlite stores (N tables x D days of daily
+table_logs rows, no rollups so every day is read) in a temp dir and times
+collect_data on each.
+
+사용법: python benchmarks/bench_collect_data.py [--tables 100,1000,5000] [--days 30,365,730]
+"""
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / 'src' / 'db'))
+
+import generate_static_html as db_gen
+from sqlite_schema import init_sqlite
+
+
+def build_store(path, n_tables, n_days):
+    """Write a synthetic store with n_tables tables and n_days daily log rows each."""
+    conn = sqlite3.connect(path)
+    init_sqlite(conn)
+    conn.executemany(
+        "INSERT INTO tables(target, name, schema_name, table_type, actual_rows, is_compressed, table_size) VALUES ('default', ?, 'public', 'table', ?, 0, ?)",
+        [(f"table_{i:05d}", i * 1000, i * 1024 ** 2) for i in range(n_tables)]
+    )
+    start = date.today() - timedelta(days=n_days)
+    days = [(start + timedelta(days=d)).isoformat() for d in range(n_days)]
+    for i in range(n_tables):
+        size = i * 1024 ** 2
+        conn.executemany(
+            """INSERT INTO table_logs(target, table_name, schema_name, date, row_count, table_size, sample_count,
+                                      row_min, row_max, row_last, size_min, size_max, size_last)
+               VALUES ('default', ?, 'public', ?, ?, ?, 12, ?, ?, ?, ?, ?, ?)""",
+            [(f"table_{i:05d}", day, d, size + d, d, d, d, size + d, size + d, size + d) for d, day in enumerate(days)]
+        )
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", default="100,1000,5000")
+    parser.add_argument("--days", default="30,365,730")
+    args = parser.parse_args()
+
+    print(f"{'tables':>7} {'days':>5} {'log rows':>10} {'collect_data':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_tables in map(int, args.tables.split(",")):
+            for n_days in map(int, args.days.split(",")):
+                path = Path(tmp) / f"bench_{n_tables}_{n_days}.sqlite"
+                build_store(path, n_tables, n_days)
+                db_gen.LOCAL_DB_PATH = path
+
+                started = time.perf_counter()
+                data = db_gen.collect_data()
+                elapsed = time.perf_counter() - started
+
+                log_rows = sum(len(v["date"]) for v in data["logs"].values())
+                print(f"{n_tables:>7} {n_days:>5} {log_rows:>10} {elapsed:>12.3f}s")
+                path.unlink()
+
+
+if __name__ == "__main__":
+    main()
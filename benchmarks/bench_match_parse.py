@@ -0,0 +1,144 @@
+"""Benchmark generate_html.parse_data (columnar) against the old dict-of-lists parse.
+
+Builds a synthetic match.sqlite with N rows (ROWS_PER_DAY matches per day,
+realistic repetition of fleets / vehicles / drivers) in a temp dir, then
+reports parse time and the memory retained by the parsed result, and the
+time / size of the page data (old embedded per-field f-strings vs
+serialize_day shards for every date).
+
+사용법: python benchmarks/bench_match_parse.py [--rows 1000000]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / 'src' / 'match'))
+
+import generate_html as match_gen
+import match_store
+
+ROWS_PER_DAY = 3000
+TYPES = ["COMPANY_OWNED", "SUBSCRIPTION", "SALES", "OWNER_OPERATOR", "OTHER", None]
+
+
+def build_store(path, n_rows, batch_size=50000):
+    """Write n_rows synthetic matches into a new store at path."""
+    def batches():
+        start = date(2026, 1, 1)
+        batch = []
+        for i in range(n_rows):
+            minute = (i * 7) % 1440
+            batch.append((
+                (start + timedelta(days=i // ROWS_PER_DAY)).isoformat(),
+                f"{i % 900:03d}가{i % 4000:04d}",
+                TYPES[i % len(TYPES)],
+                f"배송원{i % 2500}" if i % 11 else None,
+                f"{minute // 60:02d}:{minute % 60:02d}",
+                f"{(minute + 90) % 1440 // 60:02d}:{(minute + 90) % 60:02d}" if i % 3 else None,
+                f"플릿{i % 40}",
+            ))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    conn = match_store.connect(path)
+    end = date(2026, 1, 1) + timedelta(days=n_rows // ROWS_PER_DAY)
+    match_store.replace_range(conn, "2026-01-01", end.isoformat(), batches())
+    return conn
+
+
+def parse_dict_of_lists(conn):
+    """The previous parse_data: one dict per row, grouped by date."""
+    data = defaultdict(list)
+    for work_date, vehicle, op_type, driver, start_time, end_time, fleet in match_store.iter_rows(conn):
+        data[work_date].append({
+            'vehicle': vehicle,
+            'type': op_type,
+            'driver': driver,
+            'start': start_time,
+            'end': end_time,
+            'fleet': fleet
+        })
+    return dict(data)
+
+
+def serialize_fstrings(data):
+    """The previous generate_html data builder: one f-string per field."""
+    js_data_items = []
+    for date in sorted(data.keys()):
+        item_strs = []
+        for item in data[date]:
+            type_str = f'"{item["type"]}"' if item['type'] else 'null'
+            driver_str = f'"{item["driver"]}"' if item['driver'] else 'null'
+            start_str = f'"{item["start"]}"' if item['start'] else 'null'
+            end_str = f'"{item["end"]}"' if item['end'] else 'null'
+            fleet_str = f'"{item["fleet"]}"' if item['fleet'] else 'null'
+            item_strs.append(
+                f'{{ vehicle: "{item["vehicle"]}", type: {type_str}, driver: {driver_str}, start: {start_str}, end: {end_str}, fleet: {fleet_str} }}'
+            )
+        js_data_items.append(
+            f'            "{date}": [\n                ' +
+            ',\n                '.join(item_strs) +
+            '\n            ]'
+        )
+    return '{\n' + ',\n'.join(js_data_items) + '\n        }'
+
+
+def serialize_shards(data):
+    """All per-date shards generate_html would write, concatenated."""
+    return "".join(match_gen.serialize_day(data, date_idx) for date_idx in range(len(data.dates)))
+
+
+def measure(parse, conn):
+    """Return (seconds, retained MiB) for one parse."""
+    started = time.perf_counter()
+    result = parse(conn)
+    elapsed = time.perf_counter() - started
+    del result
+
+    tracemalloc.start()
+    result = parse(conn)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, retained / 1024 ** 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = build_store(Path(tmp) / "match.sqlite", args.rows)
+        print(f"{args.rows} rows")
+        print(f"{'parser':>14} {'seconds':>8} {'retained MiB':>13}")
+        for name, parse in (("dict-of-lists", parse_dict_of_lists), ("columnar", match_gen.parse_data)):
+            elapsed, retained = measure(parse, conn)
+            print(f"{name:>14} {elapsed:>8.2f} {retained:>13.1f}")
+
+        print(f"{'serializer':>14} {'seconds':>8} {'MiB':>13}")
+        for name, parse, serialize in (
+            ("f-strings", parse_dict_of_lists, serialize_fstrings),
+            ("json shards", match_gen.parse_data, serialize_shards),
+        ):
+            data = parse(conn)
+            started = time.perf_counter()
+            payload = serialize(data)
+            elapsed = time.perf_counter() - started
+            print(f"{name:>14} {elapsed:>8.2f} {len(payload.encode('utf-8')) / 1024 ** 2:>13.1f}")
+            del data, payload
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""End-to-end pipeline benchmark against the offline database stand-in (fake_pg).
+
+For each scale, in a fresh temp dir (all stores and pages redirected there):
+
+  collect_bulk         collect_metadata.collect_prod_data(mode="bulk")
+  collect_incremental  the same again in incremental mode (open chunks only)
+  collect_per_object   the same in per-object mode (one query per object)
+  match_export         query_matches.append_range over every fixture day
+  match_query_day      query_matches.query_range for the last day (streamed)
+  match_sync           query_matches.sync with a watermark (yesterday only)
+  db_html              generate_static_html.generate_html
+  match_html           generate_html.main
+  generate_all         generate_all.main(force=True, jobs=1)
+  generate_all_noop    generate_all.main(jobs=1) right after (every page skipped)
+
+and records seconds plus the fake database's query / connection counts.
+With --save-baseline the results are written to --baseline; otherwise they
+are compared with it, and a stage is flagged when it issues more queries or
+opens more connections than the baseline (for the parallel collect stages:
+than their fixed pool size), or, if the baseline has timings,
+is slower than baseline x --tolerance (and by more than --min-seconds).
+Exits non-zero when anything is flagged or the baseline is missing.
+
+The committed baseline (benchmarks/pipeline_baseline.json) holds only the
+counts, which do not depend on the machine; it is saved with --counts-only.
+Timings are machine specific: to compare them, save a baseline with timings
+to another path on the machine that compares.
+
+사용법: python benchmarks/bench_pipeline.py [--scales small,medium] [--latency-ms 0]
+        [--baseline benchmarks/pipeline_baseline.json] [--save-baseline [--counts-only]] [--output results.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / 'src' / 'db'))
+sys.path.insert(0, str(PROJECT_DIR / 'src' / 'match'))
+sys.path.insert(0, str(PROJECT_DIR / 'src' / 'common'))
+sys.path.insert(0, str(PROJECT_DIR))
+
+import collect_metadata
+import generate_all
+import generate_html as match_gen
+import generate_static_html as db_gen
+import match_store
+import query_matches
+from sqlite_schema import DEFAULT_TARGET
+
+import assets
+import fake_pg
+import pipeline_metrics
+
+# 규모별 fixture 설정 (카탈로그: 스키마 / 스키마당 하이퍼테이블 / 하이퍼테이블당 청크 / 스키마당 일반 테이블,
+# 배차: 일수 / 플릿 / 일별 매칭 수)
+SCALES = {
+    "small": {"schemas": 2, "hypertables": 5, "chunks": 20, "tables": 50,
+              "days": 30, "fleets": 10, "matches_per_day": 500},
+    "medium": {"schemas": 4, "hypertables": 20, "chunks": 100, "tables": 500,
+               "days": 120, "fleets": 40, "matches_per_day": 2000},
+    "large": {"schemas": 8, "hypertables": 50, "chunks": 200, "tables": 2000,
+              "days": 270, "fleets": 80, "matches_per_day": 3000},
+}
+
+DEFAULT_BASELINE = PROJECT_DIR / "benchmarks" / "pipeline_baseline.json"
+# 수집 단계 커넥션 풀 크기 (COLLECT_MAX_CONNECTIONS 환경변수와 무관하게 고정)
+# 단계들이 병렬로 실행되어 실제로 여는 커넥션 수는 스레드 스케줄링에 따라 1 ~ 이 값
+COLLECT_CONNECTIONS = 3
+
+
+def redirect_outputs(tmp):
+    """Point every store and generated page of the pipeline into tmp."""
+    tmp = Path(tmp)
+    collect_metadata.LOCAL_DB_PATH = tmp / "db_monitoring.sqlite"
+    db_gen.LOCAL_DB_PATH = tmp / "db_monitoring.sqlite"
+    db_gen.PROJECT_DIR = tmp
+    db_gen.HISTORY_DIR = tmp / "db_history"
+    match_store.STORE_PATH = tmp / "match.sqlite"
+    match_store.LEGACY_DATA_FILE = tmp / "data.txt"
+    match_gen.HTML_FILE = str(tmp / "match.html")
+    match_gen.MATCH_DATA_DIR = str(tmp / "match_data")
+    match_gen.INDEX_FILE = str(tmp / "match_data" / "index.json")
+    generate_all.PROJECT_DIR = tmp
+    generate_all.BUILD_STATE_FILE = tmp / "build_state.json"
+    generate_all.PIPELINE_RUNS_FILE = tmp / "pipeline_runs.json"
+    pipeline_metrics.STORE_PATH = tmp / "db_monitoring.sqlite"
+    assets.ASSETS_DIR = tmp / "assets"
+
+
+def run_scale(config, latency_ms, verbose=False):
+    """Run every stage once at one scale; returns {stage: {seconds, queries, connections, ...}}."""
+    catalog = fake_pg.FakeCatalog(config["schemas"], config["hypertables"], config["chunks"], config["tables"])
+    schedule = fake_pg.FakeSchedule(config["days"], config["fleets"], config["matches_per_day"])
+    first_day, last_day = schedule.days[0], schedule.days[-1]
+    # 수집 단계 rows: 청크 + 테이블 (하이퍼테이블 루트 포함)
+    catalog_rows = len(catalog.chunks) + len(catalog.relations)
+
+    def collect(mode):
+        report = collect_metadata.collect_prod_data([DEFAULT_TARGET], mode, COLLECT_CONNECTIONS)
+        phases = report[DEFAULT_TARGET].values()
+        errors = [error for phase in phases for error in phase.errors]
+        if errors:
+            raise RuntimeError(f"collect ({mode}) failed: {errors}")
+        return {"rows": catalog_rows, "connection_limit": COLLECT_CONNECTIONS}
+
+    def match_export():
+        store = match_store.connect()
+        rows = query_matches.append_range(first_day, last_day, store)
+        # 다음 sync 가 증분(어제만)으로 동작하도록 워터마크 기록
+        match_store.set_state(store, "watermark", schedule.watermark().isoformat(), "timestamp")
+        store.close()
+        return {"rows": rows}
+
+    stages = [
+        ("collect_bulk", lambda: collect("bulk")),
+        ("collect_incremental", lambda: collect("incremental")),
+        ("collect_per_object", lambda: collect("per-object")),
+        ("match_export", match_export),
+        ("match_query_day", lambda: {"rows": sum(map(len, query_matches.query_range(last_day, last_day)))}),
+        ("match_sync", query_matches.sync),
+        ("db_html", db_gen.generate_html),
+        ("match_html", match_gen.main),
+        # jobs=1: 워커 프로세스는 (spawn 방식에서) redirect_outputs 로 바꾼 경로를 보지 못함
+        ("generate_all", lambda: generate_all.main(force=True, jobs=1)),
+        ("generate_all_noop", lambda: generate_all.main(jobs=1)),
+    ]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, fake_pg.installed(catalog, schedule, latency_ms) as fake:
+        redirect_outputs(tmp)
+        for name, stage in stages:
+            fake.reset_counters()
+            output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+            with output:
+                started = time.perf_counter()
+                extra = stage()
+                elapsed = time.perf_counter() - started
+            result = {"seconds": round(elapsed, 4), "queries": fake.queries, "connections": fake.connections}
+            if isinstance(extra, dict):
+                result.update(extra)
+            results[name] = result
+    return results
+
+
+def compare(results, baseline, tolerance, min_seconds):
+    """Return regression messages for stages present in both results and baseline."""
+    regressions = []
+    for scale, stages in results.items():
+        for stage, current in stages.items():
+            previous = baseline.get(scale, {}).get(stage)
+            if not previous:
+                continue
+            if "seconds" in previous:
+                slower = current["seconds"] - previous["seconds"]
+                if current["seconds"] > previous["seconds"] * tolerance and slower > min_seconds:
+                    regressions.append(f"{scale}/{stage}: {previous['seconds']:.3f}s -> {current['seconds']:.3f}s")
+            if current["queries"] > previous["queries"]:
+                regressions.append(f"{scale}/{stage}: {previous['queries']} -> {current['queries']} queries")
+            # 병렬 단계는 풀 크기(connection_limit)까지는 스케줄링에 따라 달라질 수 있음
+            allowed = max(previous["connections"], previous.get("connection_limit", 0))
+            if current["connections"] > allowed:
+                regressions.append(f"{scale}/{stage}: {previous['connections']} -> {current['connections']} connections")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="small,medium", help=f"comma separated, of {', '.join(SCALES)}")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated round-trip latency per query")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write results to --baseline instead of comparing")
+    parser.add_argument("--counts-only", action="store_true",
+                        help="with --save-baseline, leave out the machine specific timings")
+    parser.add_argument("--tolerance", type=float, default=1.3, help="allowed slowdown ratio against the baseline")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="ignore slowdowns smaller than this")
+    parser.add_argument("--output", type=Path, help="also write this run's results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own output")
+    args = parser.parse_args()
+
+    results = {}
+    for scale in args.scales.split(","):
+        results[scale] = run_scale(SCALES[scale], args.latency_ms, args.verbose)
+        print(f"[{scale}] {SCALES[scale]}")
+        print(f"  {'stage':<20} {'seconds':>8} {'queries':>8} {'rows':>9}")
+        for stage, result in results[scale].items():
+            print(f"  {stage:<20} {result['seconds']:>8.3f} {result['queries']:>8} {result.get('rows', ''):>9}")
+
+    record = {
+        "recorded_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "latency_ms": args.latency_ms,
+        "scales": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(record, indent=2) + "\n", encoding="utf-8")
+
+    if args.save_baseline:
+        # 기존 기준값에 이번에 실행한 규모만 덮어씀
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else {"scales": {}}
+        baseline.update({key: value for key, value in record.items() if key != "scales"})
+        if args.counts_only:
+            # 시간은 머신마다 달라서 제외 (쿼리 / 커넥션 / 행 수만 비교)
+            results = {
+                scale: {stage: {key: value for key, value in result.items() if key != "seconds"} for stage, result in stages.items()}
+                for scale, stages in results.items()
+            }
+        baseline["scales"].update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline saved: {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline} (run with --save-baseline first)")
+        sys.exit(1)
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if baseline.get("latency_ms") != args.latency_ms:
+        print(f"Warning: baseline was recorded with --latency-ms {baseline.get('latency_ms')}")
+    regressions = compare(results, baseline["scales"], args.tolerance, args.min_seconds)
+    if regressions:
+        print("Regressions against baseline:")
+        for message in regressions:
+            print(f"  - {message}")
+        sys.exit(1)
+    print(f"No regressions against baseline ({args.baseline})")
+
+
+if __name__ == "__main__":
+    main()
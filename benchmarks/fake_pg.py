@@ -0,0 +1,296 @@
+"""Offline stand-in for the production PostgreSQL/TimescaleDB database.
+
+FakeCatalog generates the catalog views collect_metadata reads
+(timescaledb_information.chunks / hypertables, _timescaledb_catalog.chunk,
+pg_class / pg_namespace and the size functions) and FakeSchedule generates
+the schedule_drivervehiclematch join query_matches reads, both
+deterministically from a scale config. installed() patches psycopg2.connect
+(which ThreadedConnectionPool also goes through) so the real collection and
+export code runs unchanged against them, without a network.
+
+    catalog = FakeCatalog(schemas=4, hypertables=20, chunks=100, tables=500)
+    schedule = FakeSchedule(days=120, fleets=40, matches_per_day=2000)
+    with installed(catalog, schedule, latency_ms=1) as fake:
+        collect_metadata.collect_prod_data(mode="bulk")
+        print(fake.queries)
+
+Queries are recognised by their FROM / select-list fragments; anything
+else raises NotImplementedError so a changed query shows up here instead of
+silently returning nothing.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from itertools import islice
+
+import psycopg2
+from psycopg2 import extensions, sql
+
+CHUNK_SCHEMA = "_timescaledb_internal"
+OPERATION_TYPES = ["COMPANY_OWNED", "SUBSCRIPTION", "SALES", "OWNER_OPERATOR", "OTHER", None]
+
+# collect_metadata / query_matches 가 읽는 기본 대상 접속 정보 (실제 접속은 하지 않음)
+FAKE_DB_ENV = {
+    "PROD_DB_HOST": "fake-pg",
+    "PROD_DB_PORT": "5432",
+    "PROD_DB_NAME": "fake",
+    "PROD_DB_USER": "bench",
+    "PROD_DB_PASSWORD": "bench",
+}
+
+
+class FakeCatalog:
+    """Schemas of hypertables (each with `chunks` weekly chunks) and regular tables."""
+
+    def __init__(self, schemas=2, hypertables=5, chunks=20, tables=50):
+        self.schemas = [f"schema_{s:02d}" for s in range(schemas)]
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+        # (hypertable_schema, chunk_name, hypertable_name, is_compressed, range_end, is_open, status, est_rows, bytes)
+        self.chunks = []
+        # (schema, name, compression_enabled, est_rows, bytes)
+        self.hypertables = []
+        # (schema, name, est_rows, bytes) - relkind 'r' (하이퍼테이블 루트 포함)
+        self.relations = []
+
+        hypertable_id = 0
+        for schema in self.schemas:
+            for h in range(hypertables):
+                hypertable_id += 1
+                name = f"metrics_{h:03d}"
+                total_rows = total_bytes = 0
+                for k in range(chunks):
+                    # 마지막 청크만 열려 있고 (range_end 가 미래), 최근 두 개를 제외한 청크는 압축
+                    range_end = today + timedelta(days=7 * (k - chunks + 2))
+                    compressed = k < chunks - 2
+                    est_rows = 10000 + (hypertable_id * 131 + k * 17) % 50000
+                    bytes_ = est_rows * (12 if compressed else 120)
+                    self.chunks.append((
+                        schema, f"_hyper_{hypertable_id}_{k + 1}_chunk", name, compressed,
+                        range_end.strftime("%Y-%m-%d %H:%M:%S+00"), k == chunks - 1,
+                        1 if compressed else 0, est_rows, bytes_,
+                    ))
+                    total_rows += est_rows
+                    total_bytes += bytes_
+                self.hypertables.append((schema, name, True, total_rows, total_bytes + 8192))
+                self.relations.append((schema, name, 0, 8192))
+            for t in range(tables):
+                est_rows = (t * 7919) % 1000000
+                self.relations.append((schema, f"table_{t:04d}", est_rows, est_rows * 80 + 8192))
+
+        self._chunks_by_name = {(CHUNK_SCHEMA, row[1]): row for row in self.chunks}
+        self._hypertables_by_name = {(row[0], row[1]): row for row in self.hypertables}
+
+    def chunk_rows(self, schema):
+        return [row for row in self.chunks if schema is None or row[0] == schema]
+
+    def chunk(self, chunk_schema, name):
+        return self._chunks_by_name.get((chunk_schema, name))
+
+    def hypertable(self, schema, name):
+        return self._hypertables_by_name.get((schema, name))
+
+
+class FakeSchedule:
+    """`days` work days ending yesterday, `matches_per_day` matches each."""
+
+    def __init__(self, days=30, fleets=10, matches_per_day=500, drivers=None):
+        yesterday = date.today() - timedelta(days=1)
+        self.days = [(yesterday - timedelta(days=d)).isoformat() for d in range(days - 1, -1, -1)]
+        self.fleets = fleets
+        self.matches_per_day = matches_per_day
+        self.drivers = drivers or max(1, matches_per_day * 4 // 5)
+
+    def updated_at(self, work_date):
+        """Last modification of a day's matches: the following midnight."""
+        return datetime.combine(date.fromisoformat(work_date) + timedelta(days=1), dt_time())
+
+    # information_schema.columns data_type of the watermark column (updated_at)
+    watermark_type = "timestamp without time zone"
+
+    def watermark(self):
+        return self.updated_at(self.days[-1]) if self.days else None
+
+    def changed_days(self, since, until):
+        return [(day,) for day in self.days if day <= until and self.updated_at(day) > since]
+
+    def rows(self, work_dates):
+        """Yield query_matches rows for the given dates, ordered like MATCH_QUERY."""
+        n = self.matches_per_day
+        for work_date in sorted(set(work_dates) & set(self.days)):
+            d = self.days.index(work_date)
+            for i in range(n):
+                start = i * 1440 // n
+                end = start + 60 + (i * 37) % 480
+                yield (
+                    work_date,
+                    f"{(i * 13) % 900:03d}가{i:04d}",
+                    OPERATION_TYPES[i % len(OPERATION_TYPES)],
+                    "" if i % 13 == 0 else f"배송원{(i * 7 + d) % self.drivers}",
+                    f"{start // 60:02d}:{start % 60:02d}",
+                    f"{end // 60 % 24:02d}:{end % 60:02d}" if i % 5 else None,
+                    f"플릿{i % self.fleets}" if i % 17 else None,
+                )
+
+    def rows_between(self, start_date, end_date):
+        return self.rows(day for day in self.days if start_date <= day <= end_date)
+
+
+def _query_text(query):
+    """SQL text of a query string or psycopg2.sql composition (identifiers unquoted)."""
+    if isinstance(query, str):
+        return query
+    if isinstance(query, sql.Composed):
+        return "".join(_query_text(part) for part in query.seq)
+    if isinstance(query, sql.SQL):
+        return query.string
+    if isinstance(query, sql.Identifier):
+        return ".".join(query.strings)
+    raise TypeError(f"Unsupported query object: {query!r}")
+
+
+class FakeCursor:
+    """DB-API cursor answering the catalog / schedule queries of this repo."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._rows = iter(())
+
+    def execute(self, query, params=None):
+        self.connection.fake.record()
+        text = _query_text(query)
+        catalog, schedule = self.connection.fake.catalog, self.connection.fake.schedule
+        schema = params.get("schema") if isinstance(params, dict) else None
+
+        if "SELECT DISTINCT n.nspname" in text:
+            rows = [(s,) for s in catalog.schemas]
+        elif "FROM unnest(" in text:
+            names = zip(*params)
+            rows = [
+                (chunk_schema, name, row[7], row[8])
+                for chunk_schema, name in names
+                for row in [catalog.chunk(chunk_schema, name)] if row
+            ]
+        elif "timescaledb_information.chunks" in text:
+            chunks = catalog.chunk_rows(schema)
+            if "pg_total_relation_size(c.oid)" in text:  # bulk
+                rows = [(CHUNK_SCHEMA, c[1], c[2], c[3], c[4], c[6], c[7], c[8]) for c in chunks]
+            elif "is_open" in text:  # incremental 목록
+                rows = [(CHUNK_SCHEMA, c[1], c[2], c[3], c[4], c[5], c[6]) for c in chunks]
+            else:  # per-object 목록
+                rows = [(CHUNK_SCHEMA, c[1], c[2], c[3], c[4], c[6]) for c in chunks]
+        elif "timescaledb_information.hypertables" in text:
+            hypertables = [h for h in catalog.hypertables if schema is None or h[0] == schema]
+            if "hypertable_size(c.oid" in text:
+                rows = [(h[0], h[1], h[2], h[3], h[4]) for h in hypertables]
+            else:
+                rows = [(h[0], h[1], h[2]) for h in hypertables]
+        elif "hypertable_size(%s::regclass)" in text:
+            row = catalog.hypertable(params[1], params[2])
+            rows = [(row[3], row[4])] if row else []
+        elif "pg_total_relation_size(%s::regclass)" in text:
+            row = catalog.chunk(params[1], params[2])
+            rows = [(row[7], row[8])] if row else []
+        elif "c.relkind = 'r'" in text:
+            rows = [(r[0], r[1], r[2], r[3]) for r in catalog.relations if schema is None or r[0] == schema]
+        elif "information_schema.columns" in text:
+            rows = [(schedule.watermark_type,)] if params["column"] == "updated_at" else []
+        elif "schedule_drivervehiclematch" in text:
+            if "MAX(" in text:
+                rows = [(schedule.watermark(),)]
+            elif "SELECT DISTINCT work_date" in text:
+                rows = schedule.changed_days(params["since"], params["until"])
+            elif "BETWEEN" in text:
+                rows = schedule.rows_between(params["start_date"], params["end_date"])
+            elif "ANY(" in text:
+                rows = schedule.rows(params["work_dates"])
+            else:
+                raise NotImplementedError(f"fake_pg: unsupported schedule query: {text.strip()[:80]}")
+        else:
+            raise NotImplementedError(f"fake_pg: unsupported query: {text.strip()[:80]}")
+        self._rows = iter(rows)
+
+    def fetchone(self):
+        return next(self._rows, None)
+
+    def fetchmany(self, size):
+        return list(islice(self._rows, size))
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def close(self):
+        self._rows = iter(())
+
+
+class _ConnectionInfo:
+    transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeConnection:
+    """Just enough of a psycopg2 connection for psycopg2.pool and query_matches."""
+
+    info = _ConnectionInfo()
+
+    def __init__(self, fake):
+        self.fake = fake
+        self.closed = 0
+        self.autocommit = False
+
+    def cursor(self, name=None):
+        return FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+class FakeDatabase:
+    """A catalog + schedule pair, counting connections and queries (optionally with per-query latency)."""
+
+    def __init__(self, catalog=None, schedule=None, latency_ms=0.0):
+        self.catalog = catalog or FakeCatalog()
+        self.schedule = schedule or FakeSchedule()
+        self.latency = latency_ms / 1000
+        self.connections = 0
+        self.queries = 0
+        self._lock = threading.Lock()
+
+    def connect(self, *args, **kwargs):
+        with self._lock:
+            self.connections += 1
+        return FakeConnection(self)
+
+    def record(self):
+        with self._lock:
+            self.queries += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def reset_counters(self):
+        with self._lock:
+            self.connections = self.queries = 0
+
+
+@contextmanager
+def installed(catalog=None, schedule=None, latency_ms=0.0):
+    """Route psycopg2.connect (and the PROD_DB_* config) to a FakeDatabase for the duration."""
+    fake = FakeDatabase(catalog, schedule, latency_ms)
+    saved_env = {key: os.environ.get(key) for key in FAKE_DB_ENV}
+    saved_connect = psycopg2.connect
+    os.environ.update(FAKE_DB_ENV)
+    psycopg2.connect = fake.connect
+    try:
+        yield fake
+    finally:
+        psycopg2.connect = saved_connect
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
@@ -6,6 +6,9 @@ cd "$SCRIPT_DIR"
 
 IS_CI="${CI:-false}"
 
+# 단계별 계측 기록(pipeline_runs)을 한 실행으로 묶는 ID
+export PIPELINE_RUN_ID="${PIPELINE_RUN_ID:-$(date -u +%Y-%m-%dT%H:%M:%SZ)}"
+
 # Install dependencies (skip in CI, workflow handles it)
 if [ "$IS_CI" != "true" ]; then
     echo "Local mode: Installing dependencies..."
@@ -14,24 +17,38 @@ fi
 
 # 1. Collect DB metadata
 echo "Collecting DB metadata..."
-python src/db/collect_metadata.py
+python src/db/collect_metadata.py incremental
 
-# 2. Query match data (yesterday)
+# 2. Sync match data (changed days + yesterday)
 echo "Querying match data..."
-python src/match/query_matches.py today
+python src/match/query_matches.py sync
 
 # 3. Generate all HTML pages
+# 실패한 페이지가 있어도 성공한 페이지는 먼저 커밋/배포하고 마지막에 실패로 종료
 echo "Generating HTML pages..."
-python generate_all.py
+GENERATE_STATUS=0
+python generate_all.py || GENERATE_STATUS=$?
 
 # 4. Commit and push (only if not in CI)
 if [ "$IS_CI" != "true" ]; then
     echo "Committing changes..."
-    git add src/db/db_monitoring.sqlite src/match/data.txt index.html db.html match.html
+    # 존재하는 경로만 추가 (--only 로 한 페이지만 생성한 경우 다른 페이지의 출력 디렉토리가 없을 수 있음)
+    PUBLISH_PATHS=""
+    for path in src/db/db_monitoring.sqlite src/match/match.sqlite index.html db.html db_history match.html match_data assets build_state.json pipeline_runs.json; do
+        if [ -e "$path" ]; then
+            PUBLISH_PATHS="$PUBLISH_PATHS $path"
+        fi
+    done
+    git add -A -- $PUBLISH_PATHS
     git commit -m "Update monitoring dashboard $(date +'%Y-%m-%d %H:%M:%S')" || echo "No changes to commit"
 
     echo "Pushing to main..."
     git push origin main
 fi
 
+if [ "$GENERATE_STATUS" -ne 0 ]; then
+    echo "Page generation failed (see above); successful pages were published."
+    exit "$GENERATE_STATUS"
+fi
+
 echo "Deployment complete!"
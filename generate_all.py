@@ -1,45 +1,194 @@
-"""Generate all monitoring pages."""
+"""Generate all monitoring pages.
+
+Each page is rebuilt only when the hash of its inputs (store rows, templates,
+generator code) differs from the one recorded in build_state.json, and files
+are written only when their bytes change, so a run with no new data leaves
+the tree untouched. db.html and match.html are built concurrently in worker
+processes; a failing page is reported without stopping the other one.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
+import argparse
+import hashlib
+import json
+import os
 import sys
+import traceback
 
 PROJECT_DIR = Path(__file__).resolve().parent
 sys.path.insert(0, str(PROJECT_DIR / 'src' / 'db'))
 sys.path.insert(0, str(PROJECT_DIR / 'src' / 'match'))
+sys.path.insert(0, str(PROJECT_DIR / 'src' / 'common'))
+
+import assets
+import jinja_env
+import pipeline_metrics
+
+# 페이지별 입력 해시와 마지막 실제 변경 시각 (커밋 대상)
+BUILD_STATE_FILE = PROJECT_DIR / 'build_state.json'
+INDEX_TEMPLATE = PROJECT_DIR / 'templates' / 'index.html.jinja'
+# index.html 결과에 영향을 주는 코드/템플릿 (index 입력 해시에 포함)
+INDEX_SOURCE_FILES = (INDEX_TEMPLATE, Path(__file__).resolve(), Path(jinja_env.__file__).resolve())
+# index.html 의 실행 이력 패널 데이터 (단계별 소요 시간)
+PIPELINE_RUNS_FILE = PROJECT_DIR / 'pipeline_runs.json'
 
-from jinja2 import Environment, FileSystemLoader
 
+def load_build_state():
+    if BUILD_STATE_FILE.exists():
+        return json.loads(BUILD_STATE_FILE.read_text(encoding="utf-8"))
+    return {}
 
-def generate_index():
+
+def generate_index(updated_at, cache_bust):
     """Generate main index.html with tab navigation."""
-    env = Environment(loader=FileSystemLoader(PROJECT_DIR / 'templates'))
-    template = env.get_template('index.html.jinja')
-    now = datetime.now()
-    html = template.render(
-        updated_at=now.strftime("%Y-%m-%d %H:%M:%S"),
-        cache_bust=int(now.timestamp())
-    )
-    (PROJECT_DIR / 'index.html').write_text(html)
-    print("Generated index.html")
-
-
-def main():
-    """Generate all monitoring pages."""
-    print("Generating monitoring pages...")
+    if jinja_env.render_to_file(
+        "index/index.html.jinja", PROJECT_DIR / 'index.html',
+        updated_at=updated_at,
+        cache_bust=cache_bust
+    ):
+        print("Generated index.html")
 
-    # DB monitoring
-    import generate_static_html as db_gen
-    db_gen.generate_html()
 
-    # Match report
+def write_pipeline_runs():
+    """Export recent pipeline runs (per-stage seconds) for the index run-history panel."""
+    conn = pipeline_metrics.connect()
+    runs = pipeline_metrics.history(conn)
+    conn.close()
+    jinja_env.write_if_changed(PIPELINE_RUNS_FILE, json.dumps({"runs": runs}, ensure_ascii=False, separators=(",", ":")))
+
+
+def _page_steps():
+    """{page: (input digest, build, required outputs, written paths)} of the pages built from a data store."""
+    import generate_static_html as db_gen
     import generate_html as match_gen
-    match_gen.main()
 
-    # Unified index
-    generate_index()
+    # 결과 파일이 없으면 해시와 관계없이 생성, 기록 대상 경로는 bytes_written 계측용
+    return {
+        "db": (db_gen.input_digest, db_gen.generate_html,
+               [PROJECT_DIR / 'db.html', assets.ASSETS_DIR / 'db'],
+               [PROJECT_DIR / 'db.html', assets.ASSETS_DIR / 'db', db_gen.HISTORY_DIR]),
+        "match": (match_gen.input_digest, match_gen.main,
+                  [PROJECT_DIR / 'match.html', Path(match_gen.INDEX_FILE), assets.ASSETS_DIR / 'match'],
+                  [PROJECT_DIR / 'match.html', assets.ASSETS_DIR / 'match', Path(match_gen.MATCH_DATA_DIR)]),
+    }
+
+
+PAGES = ("db", "match")
+
+
+def build_page(name, force=False, previous_digest=None):
+    """Build one page unless its inputs match previous_digest; returns (name, digest, rebuilt, error, metrics).
+
+    Runs in a worker process. Failures come back as a traceback string
+    (with digest None) instead of being raised, so other pages still build.
+    The stage metrics are returned unrecorded; main() decides whether the
+    run is worth recording.
+    """
+    metrics = None
+    try:
+        input_digest, build, outputs, written = _page_steps()[name]
+        with pipeline_metrics.stage(f"generate_{name}", record_on_exit=False) as metrics:
+            digest = input_digest()
+            if not force and previous_digest == digest and all(path.exists() for path in outputs):
+                metrics.status = "skipped"
+                print(f"{name}: inputs unchanged, skipped")
+                return name, digest, False, None, metrics
+            before = pipeline_metrics.output_snapshot(written)
+            build()
+            metrics.bytes_written = pipeline_metrics.bytes_changed(before, pipeline_metrics.output_snapshot(written))
+        return name, digest, True, None, metrics
+    except Exception:
+        metrics = metrics or pipeline_metrics.StageMetrics(f"generate_{name}", status="failed")
+        return name, None, False, traceback.format_exc(), metrics
+
+
+def main(force=False, only="all", jobs=None):
+    """Generate the selected pages whose inputs changed (all of them with force), then index.html.
+
+    db and match share nothing and are built concurrently in worker
+    processes (jobs=1 builds them in this process). index.html is always
+    refreshed last because its cache key depends on the page digests.
+    Returns the names of pages that failed.
+    """
+    print("Generating monitoring pages...")
+
+    state = load_build_state()
+    inputs = dict(state.get("inputs", {}))
+    pages = [name for name in PAGES if only in ("all", name)]
+
+    # 워커 프로세스의 계측 기록도 같은 실행 ID로 묶음
+    os.environ["PIPELINE_RUN_ID"] = pipeline_metrics.RUN_ID
+    jobs = min(jobs or len(pages), len(pages))
+    if jobs > 1:
+        results = []
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {executor.submit(build_page, name, force, inputs.get(name)): name for name in pages}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    # 워커 프로세스 자체가 죽은 경우 (메모리 부족 등)
+                    name = futures[future]
+                    results.append((name, None, False, f"worker failed: {e!r}",
+                                    pipeline_metrics.StageMetrics(f"generate_{name}", status="failed")))
+    else:
+        results = [build_page(name, force, inputs.get(name)) for name in pages]
+
+    rebuilt, failed = [], []
+    stages = [metrics for *_, metrics in results]
+    for name, digest, page_rebuilt, error, _ in results:
+        if error:
+            # 실패한 페이지는 이전 해시를 유지해서 다음 실행에서 다시 생성
+            print(f"{name}: FAILED\n{error}")
+            failed.append(name)
+            continue
+        inputs[name] = digest
+        if page_rebuilt:
+            rebuilt.append(name)
+
+    # Unified index: 하위 페이지 입력이 바뀐 경우에만 갱신 시각과 캐시 키 변경
+    with pipeline_metrics.stage("generate_index", record_on_exit=False) as metrics:
+        updated_at = state.get("updated_at")
+        if rebuilt or not updated_at:
+            updated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cache_bust = hashlib.sha1(f"{inputs.get('db')}|{inputs.get('match')}".encode("utf-8")).hexdigest()[:12]
+        index_sources = b"".join(path.read_bytes() for path in INDEX_SOURCE_FILES)
+        index_digest = hashlib.sha1(index_sources + f"{cache_bust}|{updated_at}".encode("utf-8")).hexdigest()
+        if force or inputs.get("index") != index_digest or not (PROJECT_DIR / 'index.html').exists():
+            before = pipeline_metrics.output_snapshot([PROJECT_DIR / 'index.html'])
+            generate_index(updated_at, cache_bust)
+            metrics.bytes_written = pipeline_metrics.bytes_changed(before, pipeline_metrics.output_snapshot([PROJECT_DIR / 'index.html']))
+            inputs["index"] = index_digest
+        else:
+            metrics.status = "skipped"
+            print("index: inputs unchanged, skipped")
+
+    stages.append(metrics)
+
+    new_state = {"inputs": inputs, "updated_at": updated_at}
+    jinja_env.write_if_changed(BUILD_STATE_FILE, json.dumps(new_state, indent=2, sort_keys=True) + "\n")
+    # 모든 생성 단계를 건너뛴 실행은 기록/내보내지 않음 (변경 없는 실행이 저장소와 pipeline_runs.json 을 바꾸지 않도록)
+    if any(stage.status != "skipped" for stage in stages):
+        for stage in stages:
+            pipeline_metrics.record(stage, echo=False)
+        write_pipeline_runs()
+    else:
+        print("Nothing rebuilt: run not recorded")
 
-    print("\nAll pages generated!")
+    if failed:
+        print(f"\nFailed pages: {', '.join(failed)}")
+    else:
+        print("\nAll pages generated!")
+    return failed
 
 
 if __name__ == "__main__":
-    main()
+    # 사용법: python generate_all.py [--force] [--only all|db|match|index] [--jobs N]
+    parser = argparse.ArgumentParser(description="Generate all monitoring pages.")
+    parser.add_argument("--force", action="store_true", help="rebuild pages even if their inputs are unchanged")
+    parser.add_argument("--only", choices=("all",) + PAGES + ("index",), default="all",
+                        help="build one page (index.html is always refreshed)")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: one per page, 1 = in this process)")
+    args = parser.parse_args()
+    sys.exit(1 if main(args.force, args.only, args.jobs) else 0)
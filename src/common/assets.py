@@ -0,0 +1,70 @@
+"""Content-hashed, precompressed static assets of the generated pages.
+
+Page scripts and data are written as assets/<page>/<key>.<hash>.<ext>, so
+their URL changes exactly when their bytes do and they can be cached
+forever (see _headers); the HTML pages are small shells referencing them.
+Every asset (and match_data shard) gets .gz and .br copies next to it for
+hosts that serve precompressed files. Brotli is in requirements.txt; an
+environment without it still builds, with .gz copies only.
+"""
+
+import gzip
+import hashlib
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent.parent  # 3_monitoring/
+ASSETS_DIR = PROJECT_DIR / "assets"
+
+# 미리 압축한 사본 확장자 (brotli 미설치 시 .gz 만)
+COMPRESSED_SUFFIXES = (".gz", ".br") if brotli else (".gz",)
+
+
+def _compress(suffix, data: bytes) -> bytes:
+    if suffix == ".gz":
+        return gzip.compress(data, compresslevel=9, mtime=0)  # mtime=0: 같은 내용이면 같은 바이트
+    return brotli.compress(data, quality=11)
+
+
+def compressed_names(name):
+    return [name + suffix for suffix in COMPRESSED_SUFFIXES]
+
+
+def write_file(path, data: bytes) -> bool:
+    """Write data and its compressed copies unless path already holds it; returns True if written."""
+    path = Path(path)
+    written = not path.exists() or path.read_bytes() != data
+    if written:
+        path.write_bytes(data)
+    for suffix in COMPRESSED_SUFFIXES:
+        copy = path.with_name(path.name + suffix)
+        if written or not copy.exists():
+            copy.write_bytes(_compress(suffix, data))
+    return written
+
+
+def write_assets(page, assets) -> dict:
+    """Write {key: (content, ext)} under assets/<page>/ with hashed names; returns {key: url}.
+
+    Files of the page's previous builds that are no longer referenced are
+    removed (each page owns its directory, so pages built separately or in
+    parallel never delete each other's assets).
+    """
+    directory = ASSETS_DIR / page
+    directory.mkdir(parents=True, exist_ok=True)
+    urls, keep = {}, set()
+    for key, (content, ext) in assets.items():
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        name = f"{key}.{hashlib.sha1(data).hexdigest()[:12]}.{ext}"
+        write_file(directory / name, data)
+        keep.add(name)
+        keep.update(compressed_names(name))
+        urls[key] = f"{ASSETS_DIR.name}/{page}/{name}"
+    for path in directory.iterdir():
+        if path.name not in keep:
+            path.unlink()
+    return urls
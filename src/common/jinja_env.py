@@ -0,0 +1,71 @@
+"""Shared Jinja environment of the page generators (db.html, match.html, index.html).
+
+One Environment per process, so each template is compiled at most once,
+with a FileSystemBytecodeCache under .jinja_cache/ so a new process loads
+the compiled templates instead of parsing them again. Templates are
+addressed with a page prefix: "db/index.html.jinja", "match/match.html.jinja",
+"index/index.html.jinja".
+
+render_to_file streams the rendered template into a temp file next to the
+output (the whole document is never held in memory) and only replaces the
+output when the bytes differ; write_if_changed does the same for text the
+generators build themselves (JSON data, build state).
+"""
+
+import filecmp
+import os
+import tempfile
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, PrefixLoader
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent.parent  # 3_monitoring/
+TEMPLATE_DIRS = {
+    "db": PROJECT_DIR / "src" / "db" / "templates",
+    "match": PROJECT_DIR / "src" / "match" / "templates",
+    "index": PROJECT_DIR / "templates",
+}
+# 컴파일된 템플릿 캐시 (커밋 대상 아님)
+BYTECODE_CACHE_DIR = Path(os.getenv("JINJA_CACHE_DIR", PROJECT_DIR / ".jinja_cache"))
+
+_env = None
+
+
+def get_env() -> Environment:
+    global _env
+    if _env is None:
+        BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _env = Environment(
+            loader=PrefixLoader({prefix: FileSystemLoader(str(path)) for prefix, path in TEMPLATE_DIRS.items()}),
+            bytecode_cache=FileSystemBytecodeCache(str(BYTECODE_CACHE_DIR)),
+        )
+    return _env
+
+
+def render_to_file(name, path, **context) -> bool:
+    """Stream template `name` rendered with context into path; returns True if the file changed."""
+    path = Path(path)
+    template = get_env().get_template(name)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            template.stream(**context).dump(f)
+        if path.exists() and filecmp.cmp(tmp_name, path, shallow=False):
+            os.unlink(tmp_name)
+            return False
+        os.chmod(tmp_name, 0o644)  # mkstemp 은 0600 으로 생성
+        os.replace(tmp_name, path)
+        return True
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def write_if_changed(path, content) -> bool:
+    """Write text only when it differs from the file's current content; returns True if written."""
+    path = Path(path)
+    if path.exists() and path.read_text(encoding="utf-8") == content:
+        return False
+    path.write_text(content, encoding="utf-8")
+    return True
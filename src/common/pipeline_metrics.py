@@ -0,0 +1,206 @@
+"""Per-stage instrumentation of the deploy pipeline (collect -> query -> generate).
+
+Each stage runs inside `stage(name)`; on exit its wall time, DB round trips,
+rows fetched, bytes written, peak RSS and status are stored as one row of
+`pipeline_runs` in the monitoring store. Stages of one deploy share a run id
+(PIPELINE_RUN_ID, exported by deploy.sh; otherwise one per process). When
+PIPELINE_METRICS_FILE is set, the current run is also written there as
+OpenMetrics text after every stage. A stage opened with record=False is
+only measured; the caller stores it later with record() (generate_all does
+so only when some page was actually built, so a no-op build writes nothing).
+
+    with pipeline_metrics.stage("collect") as metrics:
+        ...
+        pipeline_metrics.add(round_trips=3, rows=120)  # 실행 중인 단계에 누적 (단계 밖에서는 무시)
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STORE_PATH = Path(__file__).resolve().parent.parent / "db" / "db_monitoring.sqlite"
+
+RUN_ID = os.getenv("PIPELINE_RUN_ID") or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+# 실행 이력 패널에 내보낼 최근 실행 수
+HISTORY_LIMIT = int(os.getenv("PIPELINE_HISTORY_LIMIT", "200"))
+
+# (pipeline_runs 컬럼, OpenMetrics 이름, 단위, 설명)
+METRICS = (
+    ("seconds", "monitoring_pipeline_stage_seconds", "seconds", "Wall time of the stage"),
+    ("round_trips", "monitoring_pipeline_stage_round_trips", "", "Database round trips issued by the stage"),
+    ("rows", "monitoring_pipeline_stage_rows_fetched", "", "Rows fetched from the source database"),
+    ("bytes_written", "monitoring_pipeline_stage_written_bytes", "bytes", "Bytes of generated files written"),
+    ("peak_rss", "monitoring_pipeline_stage_peak_rss_bytes", "bytes", "Peak resident set size of the stage's process"),
+)
+
+
+@dataclass
+class StageMetrics:
+    """Measurements of one pipeline stage."""
+    name: str
+    started_at: str = ""
+    seconds: float = 0.0
+    round_trips: int = 0
+    rows: int = 0
+    bytes_written: int = 0
+    peak_rss: int = 0
+    status: str = "ok"
+
+
+_active = []
+
+
+def _init(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS pipeline_runs (
+            run_id TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            started_at TEXT,
+            seconds REAL,
+            round_trips INTEGER,
+            rows INTEGER,
+            bytes_written INTEGER,
+            peak_rss INTEGER,
+            status TEXT,
+            PRIMARY KEY (run_id, stage)
+        )
+    """)
+
+
+def connect(path=None) -> sqlite3.Connection:
+    # 생성 단계가 병렬로 실행되어도 기록이 잠금 오류로 실패하지 않도록 대기
+    conn = sqlite3.connect(path or STORE_PATH, timeout=30)
+    _init(conn)
+    return conn
+
+
+def _peak_rss():
+    """Peak RSS of this process in bytes (0 where the resource module is unavailable)."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux 는 KB 단위
+
+
+def add(round_trips=0, rows=0, bytes_written=0):
+    """Add counts to the innermost running stage; no-op outside of `stage()`."""
+    if _active:
+        metrics = _active[-1]
+        metrics.round_trips += round_trips
+        metrics.rows += rows
+        metrics.bytes_written += bytes_written
+
+
+@contextmanager
+def stage(name, record_on_exit=True):
+    """Measure the enclosed block as stage `name` and record it (status 'failed' if it raises).
+
+    With record_on_exit=False the measurements are only printed; pass the
+    yielded StageMetrics to record() to store them.
+    """
+    metrics = StageMetrics(name, started_at=datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"))
+    _active.append(metrics)
+    started = time.perf_counter()
+    try:
+        yield metrics
+    except BaseException:
+        metrics.status = "failed"
+        raise
+    finally:
+        _active.pop()
+        metrics.seconds = time.perf_counter() - started
+        metrics.peak_rss = _peak_rss()
+        if record_on_exit:
+            record(metrics)
+        else:
+            _print_summary(metrics)
+
+
+def _print_summary(metrics: StageMetrics):
+    print(f"[{metrics.name}] {metrics.status} in {metrics.seconds:.2f}s, {metrics.round_trips} round trips, "
+          f"{metrics.rows} rows, {metrics.bytes_written} bytes written, peak RSS {metrics.peak_rss / 1024 ** 2:.0f} MiB")
+
+
+def record(metrics: StageMetrics, run_id=None, echo=True):
+    """Store one stage row (replacing a rerun of the same stage) and refresh the OpenMetrics file."""
+    run_id = run_id or RUN_ID
+    try:
+        conn = connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pipeline_runs(run_id, stage, started_at, seconds, round_trips, rows, bytes_written, peak_rss, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, metrics.name, metrics.started_at, round(metrics.seconds, 3), metrics.round_trips,
+                 metrics.rows, metrics.bytes_written, metrics.peak_rss, metrics.status)
+            )
+        metrics_file = os.getenv("PIPELINE_METRICS_FILE")
+        if metrics_file:
+            Path(metrics_file).write_text(openmetrics(conn, run_id), encoding="utf-8")
+        conn.close()
+    except (sqlite3.Error, OSError) as e:
+        # 계측 실패로 파이프라인을 멈추지 않음
+        print(f"pipeline_metrics: failed to record {metrics.name}: {e}")
+    if echo:
+        _print_summary(metrics)
+
+
+def openmetrics(conn: sqlite3.Connection, run_id=None) -> str:
+    """OpenMetrics text exposition of every recorded stage of run_id."""
+    run_id = run_id or RUN_ID
+    columns = ", ".join(column for column, *_ in METRICS)
+    rows = conn.execute(
+        f"SELECT stage, status, {columns} FROM pipeline_runs WHERE run_id = ? ORDER BY started_at, stage",
+        (run_id,)
+    ).fetchall()
+    lines = []
+    for i, (_, name, unit, help_text) in enumerate(METRICS):
+        lines.append(f"# TYPE {name} gauge")
+        if unit:
+            lines.append(f"# UNIT {name} {unit}")
+        lines.append(f"# HELP {name} {help_text}.")
+        for stage_name, status, *values in rows:
+            lines.append(f'{name}{{run_id="{run_id}",stage="{stage_name}",status="{status}"}} {values[i]}')
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def history(conn: sqlite3.Connection, limit=None):
+    """Most recent runs, oldest first: [{run_id, started_at, stages: {stage: [seconds, status]}}]."""
+    recent = conn.execute(
+        "SELECT run_id, MIN(started_at) FROM pipeline_runs GROUP BY run_id ORDER BY MIN(started_at) DESC, run_id DESC LIMIT ?",
+        (limit or HISTORY_LIMIT,)
+    ).fetchall()
+    runs = {run_id: {"run_id": run_id, "started_at": started_at, "stages": {}} for run_id, started_at in reversed(recent)}
+    for run_id, stage_name, seconds, status in conn.execute(
+        "SELECT run_id, stage, seconds, status FROM pipeline_runs WHERE run_id IN (SELECT value FROM json_each(?)) ORDER BY started_at, stage",
+        (json.dumps(list(runs)),)
+    ):
+        runs[run_id]["stages"][stage_name] = [seconds, status]
+    return list(runs.values())
+
+def output_snapshot(paths):
+    """{file: (size, mtime_ns)} for the given files and every file under the given directories."""
+    snapshot = {}
+    for path in map(Path, paths):
+        files = path.rglob("*") if path.is_dir() else [path]
+        for file in files:
+            if file.is_file():
+                stat = file.stat()
+                snapshot[file] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+def bytes_changed(before, after):
+    """Total size of files that are new or were rewritten between two snapshots."""
+    return sum(size for file, (size, mtime) in after.items() if before.get(file) != (size, mtime))
@@ -0,0 +1,104 @@
+// 가상 스크롤 테이블 (db.html, match.html 공용)
+// 스크롤 영역에 보이는 행(+ 위아래 여유분)만 tbody 에 렌더링하고, 나머지는 높이만 차지하는 빈 행으로 대체.
+// 정렬은 DOM 이 아닌 행 순서 배열(order)을 미리 계산된 컬럼 배열 기준으로 재정렬.
+//
+//   const vt = new VirtualTable({
+//       scroller: element,          // overflow-y: auto 인 스크롤 영역 (thead 는 position: sticky)
+//       body: tbodyElement,
+//       columns: 5,                 // 빈 행 colspan
+//       renderRow: (row, pos, start, end) => '<tr>...</tr>',  // row = 데이터 행 번호, pos = 화면 위치, [start, end) = 렌더링 구간
+//   });
+//   vt.setRows(count);              // 행 수 변경 (순서 초기화, 처음 한 번 행 높이 측정)
+//   vt.sortBy(keys, asc);           // keys[row] = 정렬 키 (숫자 또는 문자열)
+(function () {
+    const collator = new Intl.Collator(undefined, { numeric: true, sensitivity: 'base' });
+
+    function VirtualTable(options) {
+        this.scroller = options.scroller;
+        this.body = options.body;
+        this.columns = options.columns;
+        this.renderRow = options.renderRow;
+        this.rowHeight = options.rowHeight || 45;
+        this.overscan = options.overscan || 20;
+        this.order = new Int32Array(0);
+        this.window = [-1, -1];
+        this.pending = false;
+        this.calibrated = false;
+
+        const schedule = () => this.schedule();
+        this.scroller.addEventListener('scroll', schedule, { passive: true });
+        window.addEventListener('resize', schedule);
+    }
+
+    VirtualTable.escape = function (value) {
+        return String(value).replace(/[&<>"']/g, ch => ({
+            '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+        })[ch]);
+    };
+
+    VirtualTable.prototype.setRows = function (count) {
+        this.order = new Int32Array(count);
+        for (let i = 0; i < count; i++) this.order[i] = i;
+        this.scroller.scrollTop = 0;
+        this.calibrate();
+        this.render(true);
+    };
+
+    // 첫 행 하나만 렌더링해서 실제 행 높이 측정 (한 번만, 화면에 보이지 않아 높이가 0 이면 다음 setRows 에서 다시)
+    // 렌더링 중에 보정하면 높이가 다른 행(줄바꿈, rowspan 그룹)을 만날 때마다 구간이 바뀌어 재렌더링이 반복됨
+    VirtualTable.prototype.calibrate = function () {
+        if (this.calibrated || this.order.length === 0) return;
+        this.body.innerHTML = this.renderRow(this.order[0], 0, 0, 1);
+        const sample = this.body.querySelector('tr');
+        if (sample && sample.offsetHeight) {
+            this.rowHeight = sample.offsetHeight;
+            this.calibrated = true;
+        }
+    };
+
+    VirtualTable.prototype.sortBy = function (keys, asc) {
+        const numeric = keys.length > 0 && typeof keys[0] === 'number';
+        const dir = asc ? 1 : -1;
+        const compare = numeric
+            ? (a, b) => (keys[a] - keys[b]) * dir
+            : (a, b) => collator.compare(keys[a], keys[b]) * dir;
+        // Int32Array.sort 는 비교 함수가 있으면 안정 정렬이 아닐 수 있어 일반 배열로 정렬
+        this.order = Int32Array.from(Array.from(this.order).sort(compare));
+        this.render(true);
+    };
+
+    VirtualTable.prototype.schedule = function () {
+        if (this.pending) return;
+        this.pending = true;
+        requestAnimationFrame(() => {
+            this.pending = false;
+            this.render(false);
+        });
+    };
+
+    VirtualTable.prototype.spacer = function (height) {
+        if (height <= 0) return '';
+        return `<tr class="vt-spacer" style="height:${height}px"><td colspan="${this.columns}" style="padding:0;border:0"></td></tr>`;
+    };
+
+    VirtualTable.prototype.render = function (force) {
+        const count = this.order.length;
+        // thead 높이만큼은 스크롤해도 본문이 보이지 않으므로 제외
+        const top = Math.max(0, this.scroller.scrollTop - this.body.offsetTop);
+        const visible = Math.ceil(this.scroller.clientHeight / this.rowHeight);
+        const first = Math.floor(top / this.rowHeight);
+        const start = Math.max(0, first - this.overscan);
+        const end = Math.min(count, first + visible + this.overscan);
+        if (!force && start === this.window[0] && end === this.window[1]) return;
+        this.window = [start, end];
+
+        const parts = [this.spacer(start * this.rowHeight)];
+        for (let pos = start; pos < end; pos++) {
+            parts.push(this.renderRow(this.order[pos], pos, start, end));
+        }
+        parts.push(this.spacer((count - end) * this.rowHeight));
+        this.body.innerHTML = parts.join('');
+    };
+
+    window.VirtualTable = VirtualTable;
+})();
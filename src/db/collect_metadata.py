@@ -2,73 +2,40 @@
 
 import os
 import sqlite3
-from datetime import datetime, timezone
-import psycopg2
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
 from pathlib import Path
 
+from history import compact_logs, prune_samples, record_samples
+from sqlite_schema import DEFAULT_TARGET, init_sqlite
+
 # 스크립트 위치 기준 경로 설정
 SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(SCRIPT_DIR.parent / "common"))
+
+import pipeline_metrics
+
 load_dotenv(dotenv_path=PROJECT_DIR / ".env")
 
 LOCAL_DB_PATH = SCRIPT_DIR / "db_monitoring.sqlite"
 
-def _now_iso():
-    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+# incremental 모드에서 닫힌 청크도 이 시간이 지나면 다시 측정 (늦은 INSERT/DELETE 반영)
+CHUNK_REMEASURE_HOURS = int(os.getenv("CHUNK_REMEASURE_HOURS", "168"))
 
-def _sqlite_init(conn: sqlite3.Connection):
-    # 1. 메인 테이블 정보 (하이퍼테이블 & 일반 테이블) - 대시보드 표시용
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS tables (
-            name TEXT,
-            schema_name TEXT,
-            table_type TEXT,
-            actual_rows INTEGER,
-            is_compressed BOOLEAN DEFAULT FALSE,
-            table_size INTEGER
-        )
-    """)
-    
-    # 2. 청크 정보 별도 분리 - 상세 분석용 (대시보드 합산 제외)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS chunks (
-            chunk_name TEXT,
-            schema_name TEXT,
-            hypertable_name TEXT,
-            actual_rows INTEGER,
-            is_compressed BOOLEAN DEFAULT FALSE,
-            table_size INTEGER
-        )
-    """)
+# 프로덕션 DB 동시 접속 상한 (수집 단계 작업이 이 수만큼 병렬 실행, 대상 DB별)
+COLLECT_MAX_CONNECTIONS = int(os.getenv("COLLECT_MAX_CONNECTIONS", "3"))
 
-    # 3. 로그 테이블 (메인 테이블 기준 이력)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS table_logs (
-            table_name TEXT,
-            schema_name TEXT,
-            date TEXT,
-            row_count INTEGER,
-            table_size INTEGER,
-            sample_count INTEGER DEFAULT 1
-        )
-    """)
 
-    # Migration: Add sample_count column if it doesn't exist
-    try:
-        conn.execute("ALTER TABLE table_logs ADD COLUMN sample_count INTEGER DEFAULT 1")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
-
-    # 4. 실행 정보
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS run_info (
-            collected_at TEXT,
-            mode TEXT,
-            db_host TEXT,
-            db_name TEXT
-        )
-    """)
+def _now_iso():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 def _require_env(key: str) -> str:
     v = os.getenv(key)
@@ -76,176 +43,510 @@ def _require_env(key: str) -> str:
         raise RuntimeError(f"Missing required env: {key}")
     return v
 
-def _get_prod_db_config():
+def _get_targets():
+    """Return target keys from PROD_DB_TARGETS (comma separated), or the single default target."""
+    raw = os.getenv("PROD_DB_TARGETS", "")
+    targets = [t.strip() for t in raw.split(",") if t.strip()]
+    return targets or [DEFAULT_TARGET]
+
+def _get_prod_db_config(target=DEFAULT_TARGET):
+    # default 대상은 PROD_DB_*, 그 외 대상은 PROD_DB_<TARGET>_* 환경변수 사용
+    if not target.replace("_", "").isalnum():
+        raise RuntimeError(f"Invalid target name: {target}")
+    prefix = "PROD_DB_" if target == DEFAULT_TARGET else f"PROD_DB_{target.upper()}_"
     return {
-        "host": _require_env("PROD_DB_HOST"),
-        "port": int(os.getenv("PROD_DB_PORT", "5432")),
-        "database": _require_env("PROD_DB_NAME"),
-        "user": _require_env("PROD_DB_USER"),
-        "password": _require_env("PROD_DB_PASSWORD"),
+        "host": _require_env(f"{prefix}HOST"),
+        "port": int(os.getenv(f"{prefix}PORT", "5432")),
+        "database": _require_env(f"{prefix}NAME"),
+        "user": _require_env(f"{prefix}USER"),
+        "password": _require_env(f"{prefix}PASSWORD"),
     }
 
-def collect_prod_data():
-    cfg = _get_prod_db_config()
+# 수집 모드
+# - bulk: 카탈로그 일괄 조회 (청크/하이퍼테이블 크기를 몇 번의 쿼리로 수집)
+# - incremental: 청크 목록만 조회하고 신규/열린/압축 변경 청크만 다시 측정
+# - per-object: 객체마다 pg_class / 크기 함수를 개별 조회 (기존 방식)
+COLLECT_MODES = ("bulk", "incremental", "per-object")
 
-    sqlite_conn = sqlite3.connect(LOCAL_DB_PATH)
-    _sqlite_init(sqlite_conn)
+class _CountingCursor:
+    """psycopg2 cursor wrapper that counts execute() calls (DB round trips)."""
 
-    pg = psycopg2.connect(**cfg)
-    pg.autocommit = True
-    cur = pg.cursor()
+    def __init__(self, cur):
+        self._cur = cur
+        self.round_trips = 0
 
-    tables_data = [] # 하이퍼테이블 + 일반테이블 (대시보드용)
-    chunks_data = [] # 청크 (분석용, 별도 저장)
+    def execute(self, query, params=None):
+        self.round_trips += 1
+        return self._cur.execute(query, params)
 
-    print("Connected to DB. Starting collection...")
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
 
-    # 1) Timescale chunks 수집 -> 'chunks' 테이블로 분리
-    try:
+class _PgPool:
+    """Bounded psycopg2 connection pool handing out counting cursors."""
+
+    def __init__(self, cfg, max_connections):
+        self._pool = ThreadedConnectionPool(1, max_connections, **cfg)
+        self._lock = threading.Lock()
+        self.round_trips = 0
+
+    @contextmanager
+    def cursor(self):
+        conn = self._pool.getconn()
+        conn.autocommit = True
+        cur = _CountingCursor(conn.cursor())
+        try:
+            yield cur
+        finally:
+            cur.close()
+            self._pool.putconn(conn)
+            with self._lock:
+                self.round_trips += cur.round_trips
+
+    def close(self):
+        self._pool.closeall()
+
+@dataclass
+class PhaseResult:
+    """Timing and outcome of one collection phase across all of its schema tasks."""
+    name: str
+    seconds: float = 0.0
+    round_trips: int = 0
+    errors: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not self.errors
+
+def _load_chunk_state(sqlite_conn: sqlite3.Connection, target=DEFAULT_TARGET):
+    """Return last collected chunk rows of `target` keyed by (schema, chunk_name)."""
+    cursor = sqlite_conn.execute("""
+        SELECT chunk_name, schema_name, hypertable_name, actual_rows, is_compressed,
+               table_size, range_end, chunk_status, measured_at
+        FROM chunks
+        WHERE target = ?
+    """, (target,))
+    return {(row[1], row[0]): row for row in cursor.fetchall()}
+
+def _needs_measure(prev, range_end, is_open, is_compressed, status, stale_before):
+    """Decide whether a chunk must be re-measured in incremental mode."""
+    if prev is None or is_open:
+        return True  # 신규 청크 또는 아직 데이터가 들어오는 열린 청크
+    _, _, _, _, prev_compressed, _, prev_range_end, prev_status, measured_at = prev
+    if bool(prev_compressed) != bool(is_compressed) or prev_status != status:
+        return True  # 압축/해제/재압축(status 변경)된 청크
+    if prev_range_end != range_end:
+        return True
+    return not measured_at or measured_at < stale_before
+
+def _collect_chunks(cur, mode, state=None, schema=None):
+    """Return chunk tuples: (name, schema, hypertable, est_rows, is_compressed, bytes, range_end, status, measured_at).
+
+    In incremental mode `state` holds the previous run's rows (see
+    `_load_chunk_state`); only new, open, recompressed or stale chunks are
+    measured and the rest are carried forward unchanged. `schema` limits the
+    work to chunks of hypertables in that schema.
+    """
+    chunks_data = []
+    measured_at = _now_iso()
+
+    if mode == "incremental":
+        state = state or {}
+        max_age = timedelta(hours=CHUNK_REMEASURE_HOURS)
+        stale_before = (datetime.now(timezone.utc) - max_age).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        # 청크 목록만 조회 (크기 계산 없음)
+        # status: _timescaledb_catalog.chunk 압축 상태 비트 (부분 압축 -> 재압축 감지용)
         cur.execute("""
             SELECT
-              chunk_schema,
-              chunk_name,
-              hypertable_name,
-              is_compressed
-            FROM timescaledb_information.chunks
-            WHERE chunk_schema NOT IN ('pg_catalog', 'information_schema')
-        """)
-        chunk_rows = cur.fetchall()
-
-        for schema, name, hypertable, is_compressed in chunk_rows:
+              ch.chunk_schema,
+              ch.chunk_name,
+              ch.hypertable_name,
+              ch.is_compressed,
+              COALESCE(ch.range_end::text, ch.range_end_integer::text) AS range_end,
+              COALESCE(ch.range_end > now(), true) AS is_open,
+              cc.status
+            FROM timescaledb_information.chunks ch
+            LEFT JOIN _timescaledb_catalog.chunk cc
+              ON cc.schema_name = ch.chunk_schema AND cc.table_name = ch.chunk_name
+            WHERE ch.chunk_schema NOT IN ('pg_catalog', 'information_schema')
+              AND (%(schema)s::text IS NULL OR ch.hypertable_schema = %(schema)s)
+        """, {"schema": schema})
+        listing = cur.fetchall()
+
+        to_measure = [
+            (chunk_schema, name)
+            for chunk_schema, name, _, is_compressed, range_end, is_open, status in listing
+            if _needs_measure(state.get((chunk_schema, name)), range_end, is_open, is_compressed, status, stale_before)
+        ]
+
+        # 변경된 청크만 한 번에 측정
+        to_measure_keys = set(to_measure)
+        measured = {}
+        if to_measure:
             cur.execute("""
                 SELECT
+                  n.nspname,
+                  c.relname,
                   COALESCE(c.reltuples::bigint, 0) AS est_rows,
-                  pg_total_relation_size(%s::regclass) AS bytes
-                FROM pg_class c
-                JOIN pg_namespace n ON n.oid = c.relnamespace
-                WHERE n.nspname = %s AND c.relname = %s
-                LIMIT 1
-            """, (f"{schema}.{name}", schema, name))
-            r = cur.fetchone()
-            if not r:
-                continue
-            est_rows, bytes_ = int(r[0] or 0), int(r[1] or 0)
-            
-            # chunks 리스트에 저장
-            chunks_data.append((name, schema, hypertable, est_rows, bool(is_compressed), bytes_))
-    except Exception as e:
-        print(f"Warning: Failed to collect chunks (TimescaleDB might not be active): {e}")
-
-    # 2) Hypertables (있으면) -> 'tables' 테이블에 저장
-    # hypertable_size()를 사용하여 이미 모든 청크 용량이 포함됨
-    hypertables = set()
-    try:
+                  pg_total_relation_size(c.oid) AS bytes
+                FROM unnest(%s::text[], %s::text[]) AS t(schema_name, chunk_name)
+                JOIN pg_namespace n ON n.nspname = t.schema_name
+                JOIN pg_class c ON c.relnamespace = n.oid AND c.relname = t.chunk_name
+            """, ([s for s, _ in to_measure], [n for _, n in to_measure]))
+            measured = {(s, n): (est_rows, bytes_) for s, n, est_rows, bytes_ in cur.fetchall()}
+
+        for chunk_schema, name, hypertable, is_compressed, range_end, _, status in listing:
+            key = (chunk_schema, name)
+            if key in measured:
+                est_rows, bytes_ = measured[key]
+                chunks_data.append((name, chunk_schema, hypertable, int(est_rows or 0), bool(is_compressed), int(bytes_ or 0), range_end, status, measured_at))
+            elif key not in to_measure_keys:
+                # 변경 없는 청크는 이전 측정값을 그대로 이어서 저장
+                prev = state[key]
+                chunks_data.append((name, chunk_schema, hypertable, prev[3], bool(prev[4]), prev[5], range_end, status, prev[8]))
+
+        print(f"Incremental ({schema or 'all'}): measured {len(measured)} of {len(listing)} chunks, carried forward {len(chunks_data) - len(measured)}.")
+        return chunks_data
+
+    if mode == "bulk":
+        # 청크 목록과 크기를 한 번에 조회 (pg_class 조인으로 청크별 왕복 제거)
         cur.execute("""
-            SELECT hypertable_schema, hypertable_name, compression_enabled
-            FROM timescaledb_information.hypertables
-            WHERE hypertable_schema NOT IN ('pg_catalog','information_schema')
-        """)
-        for schema, name, compression_enabled in cur.fetchall():
-            hypertables.add((schema, name))
-            
-            cur.execute("""
-                SELECT
-                  COALESCE(c.reltuples::bigint, 0) AS est_rows,
-                  hypertable_size(%s::regclass) AS bytes
-                FROM pg_class c
-                JOIN pg_namespace n ON n.oid = c.relnamespace
-                WHERE n.nspname = %s AND c.relname = %s
-                LIMIT 1
-            """, (f"{schema}.{name}", schema, name))
-            r = cur.fetchone()
-            if not r:
-                continue
-            est_rows, bytes_ = int(r[0] or 0), int(r[1] or 0)
-            
-            # tables 리스트에 저장
-            tables_data.append((name, schema, "hypertable", est_rows, bool(compression_enabled), bytes_))
-    except Exception as e:
-        print(f"Warning: Failed to collect hypertables: {e}")
-
-    # 3) Regular tables (chunks/hypertables 제외) -> 'tables' 테이블에 저장
-    try:
+            SELECT
+              ch.chunk_schema,
+              ch.chunk_name,
+              ch.hypertable_name,
+              ch.is_compressed,
+              COALESCE(ch.range_end::text, ch.range_end_integer::text) AS range_end,
+              cc.status,
+              COALESCE(c.reltuples::bigint, 0) AS est_rows,
+              pg_total_relation_size(c.oid) AS bytes
+            FROM timescaledb_information.chunks ch
+            JOIN pg_namespace n ON n.nspname = ch.chunk_schema
+            JOIN pg_class c ON c.relnamespace = n.oid AND c.relname = ch.chunk_name
+            LEFT JOIN _timescaledb_catalog.chunk cc
+              ON cc.schema_name = ch.chunk_schema AND cc.table_name = ch.chunk_name
+            WHERE ch.chunk_schema NOT IN ('pg_catalog', 'information_schema')
+              AND (%(schema)s::text IS NULL OR ch.hypertable_schema = %(schema)s)
+        """, {"schema": schema})
+        for chunk_schema, name, hypertable, is_compressed, range_end, status, est_rows, bytes_ in cur.fetchall():
+            chunks_data.append((name, chunk_schema, hypertable, int(est_rows or 0), bool(is_compressed), int(bytes_ or 0), range_end, status, measured_at))
+        return chunks_data
+
+    cur.execute("""
+        SELECT
+          ch.chunk_schema,
+          ch.chunk_name,
+          ch.hypertable_name,
+          ch.is_compressed,
+          COALESCE(ch.range_end::text, ch.range_end_integer::text) AS range_end,
+          cc.status
+        FROM timescaledb_information.chunks ch
+        LEFT JOIN _timescaledb_catalog.chunk cc
+          ON cc.schema_name = ch.chunk_schema AND cc.table_name = ch.chunk_name
+        WHERE ch.chunk_schema NOT IN ('pg_catalog', 'information_schema')
+          AND (%(schema)s::text IS NULL OR ch.hypertable_schema = %(schema)s)
+    """, {"schema": schema})
+    chunk_rows = cur.fetchall()
+
+    for chunk_schema, name, hypertable, is_compressed, range_end, status in chunk_rows:
         cur.execute("""
-            SELECT n.nspname, c.relname,
-                   COALESCE(c.reltuples::bigint, 0) AS est_rows,
-                   pg_total_relation_size((quote_ident(n.nspname)||'.'||quote_ident(c.relname))::regclass) AS bytes
+            SELECT
+              COALESCE(c.reltuples::bigint, 0) AS est_rows,
+              pg_total_relation_size(%s::regclass) AS bytes
             FROM pg_class c
             JOIN pg_namespace n ON n.oid = c.relnamespace
-            WHERE c.relkind = 'r'
-              AND n.nspname NOT IN ('pg_catalog','information_schema')
-              AND n.nspname NOT LIKE 'pg_toast%'
-              AND n.nspname NOT LIKE '_timescaledb_%'
-        """)
-        for schema, name, est_rows, bytes_ in cur.fetchall():
-            if (schema, name) in hypertables:
-                continue
-            tables_data.append((name, schema, "table", int(est_rows or 0), False, int(bytes_ or 0)))
-    except Exception as e:
-        print(f"Warning: Failed to collect regular tables: {e}")
+            WHERE n.nspname = %s AND c.relname = %s
+            LIMIT 1
+        """, (f"{chunk_schema}.{name}", chunk_schema, name))
+        r = cur.fetchone()
+        if not r:
+            continue
+        est_rows, bytes_ = int(r[0] or 0), int(r[1] or 0)
 
-    # --- Write to SQLite ---
+        # chunks 리스트에 저장
+        chunks_data.append((name, chunk_schema, hypertable, est_rows, bool(is_compressed), bytes_, range_end, status, measured_at))
+    return chunks_data
 
+def _collect_hypertables(cur, mode, schema=None):
+    """Return hypertable tuples, sized with hypertable_size() (includes all chunks)."""
+    tables_data = []
+
+    if mode != "per-object":
+        # 하이퍼테이블 목록과 hypertable_size()를 한 번에 조회
+        cur.execute("""
+            SELECT
+              h.hypertable_schema,
+              h.hypertable_name,
+              h.compression_enabled,
+              COALESCE(c.reltuples::bigint, 0) AS est_rows,
+              hypertable_size(c.oid::regclass) AS bytes
+            FROM timescaledb_information.hypertables h
+            JOIN pg_namespace n ON n.nspname = h.hypertable_schema
+            JOIN pg_class c ON c.relnamespace = n.oid AND c.relname = h.hypertable_name
+            WHERE h.hypertable_schema NOT IN ('pg_catalog','information_schema')
+              AND (%(schema)s::text IS NULL OR h.hypertable_schema = %(schema)s)
+        """, {"schema": schema})
+        for ht_schema, name, compression_enabled, est_rows, bytes_ in cur.fetchall():
+            tables_data.append((name, ht_schema, "hypertable", int(est_rows or 0), bool(compression_enabled), int(bytes_ or 0)))
+        return tables_data
+
+    cur.execute("""
+        SELECT hypertable_schema, hypertable_name, compression_enabled
+        FROM timescaledb_information.hypertables
+        WHERE hypertable_schema NOT IN ('pg_catalog','information_schema')
+          AND (%(schema)s::text IS NULL OR hypertable_schema = %(schema)s)
+    """, {"schema": schema})
+    for ht_schema, name, compression_enabled in cur.fetchall():
+        cur.execute("""
+            SELECT
+              COALESCE(c.reltuples::bigint, 0) AS est_rows,
+              hypertable_size(%s::regclass) AS bytes
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = %s AND c.relname = %s
+            LIMIT 1
+        """, (f"{ht_schema}.{name}", ht_schema, name))
+        r = cur.fetchone()
+        if not r:
+            continue
+        est_rows, bytes_ = int(r[0] or 0), int(r[1] or 0)
+
+        # tables 리스트에 저장
+        tables_data.append((name, ht_schema, "hypertable", est_rows, bool(compression_enabled), bytes_))
+    return tables_data
+
+def _collect_regular_tables(cur, schema=None):
+    """Return regular table tuples (hypertable root tables are filtered out by the caller)."""
+    tables_data = []
+    cur.execute("""
+        SELECT n.nspname, c.relname,
+               COALESCE(c.reltuples::bigint, 0) AS est_rows,
+               pg_total_relation_size((quote_ident(n.nspname)||'.'||quote_ident(c.relname))::regclass) AS bytes
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind = 'r'
+          AND n.nspname NOT IN ('pg_catalog','information_schema')
+          AND n.nspname NOT LIKE 'pg_toast%%'
+          AND n.nspname NOT LIKE '_timescaledb_%%'
+          AND (%(schema)s::text IS NULL OR n.nspname = %(schema)s)
+    """, {"schema": schema})
+    for table_schema, name, est_rows, bytes_ in cur.fetchall():
+        tables_data.append((name, table_schema, "table", int(est_rows or 0), False, int(bytes_ or 0)))
+    return tables_data
+
+def _list_schemas(cur):
+    """Return user schemas that contain tables; the unit of parallel work."""
+    cur.execute("""
+        SELECT DISTINCT n.nspname
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind = 'r'
+          AND n.nspname NOT IN ('pg_catalog','information_schema')
+          AND n.nspname NOT LIKE 'pg_toast%'
+          AND n.nspname NOT LIKE '_timescaledb_%'
+        ORDER BY n.nspname
+    """)
+    return [row[0] for row in cur.fetchall()]
+
+def _collect_phases(pool, mode, state, max_connections):
+    """Run chunk/hypertable/table phases concurrently on up to `max_connections` connections.
+
+    bulk/incremental run each phase as one set-based query over all schemas,
+    so only the phases run in parallel; per-object, which issues one query per
+    object, also splits every phase per schema. Returns ({phase: rows},
+    {phase: PhaseResult}). A failing task is recorded on its phase and does
+    not stop the other tasks (its rows are empty; the caller keeps the
+    target's previous rows instead of writing partial results).
+    """
+    phases = {
+        "chunks": lambda cur, schema: _collect_chunks(cur, mode, state, schema),
+        "hypertables": lambda cur, schema: _collect_hypertables(cur, mode, schema),
+        "tables": lambda cur, schema: _collect_regular_tables(cur, schema),
+    }
+    results = {name: PhaseResult(name) for name in phases}
+    rows_by_task = {}
+    spans = {name: [] for name in phases}
+
+    if mode == "per-object":
+        with pool.cursor() as cur:
+            schemas = _list_schemas(cur)
+    else:
+        schemas = [None]  # None: 스키마 전체 (단계당 쿼리 수가 스키마 수와 무관)
+
+    def run(phase, schema):
+        started = time.perf_counter()
+        rows, error, round_trips = [], None, 0
+        try:
+            with pool.cursor() as cur:
+                try:
+                    rows = phases[phase](cur, schema)
+                finally:
+                    round_trips = cur.round_trips
+        except Exception as e:
+            error = f"{schema or 'all schemas'}: {e}"
+        return started, time.perf_counter(), round_trips, rows, error
+
+    # 단계 (x 스키마) 작업을 커넥션 수만큼만 동시에 실행
+    with ThreadPoolExecutor(max_workers=max_connections) as executor:
+        futures = {
+            executor.submit(run, phase, schema): (phase, schema)
+            for phase in phases
+            for schema in schemas
+        }
+        for future in as_completed(futures):
+            phase, schema = futures[future]
+            started, finished, round_trips, rows, error = future.result()
+            spans[phase].append((started, finished))
+            results[phase].round_trips += round_trips
+            if error:
+                results[phase].errors.append(error)
+            rows_by_task[(phase, schema)] = rows
+
+    for phase, phase_spans in spans.items():
+        if phase_spans:
+            results[phase].seconds = max(f for _, f in phase_spans) - min(s for s, _ in phase_spans)
+
+    # 스키마 순서대로 합쳐서 실행마다 같은 순서를 유지
+    collected = {
+        phase: [row for schema in schemas for row in rows_by_task.get((phase, schema), [])]
+        for phase in phases
+    }
+    return collected, results
+
+def _print_phase_report(results):
+    print("Phase report:")
+    for result in results.values():
+        status = "ok" if result.ok else f"FAILED ({len(result.errors)} task(s))"
+        print(f"  {result.name:<12} {result.seconds:7.2f}s  {result.round_trips:5d} queries  {status}")
+        for error in result.errors:
+            print(f"    - {error}")
+
+def _collect_target(cfg, mode, state, max_connections):
+    """Collect one target DB; returns (tables_data, chunks_data, phase results, round trips)."""
+    pool = _PgPool(cfg, max_connections)
+
+    # 청크 / 하이퍼테이블 / 일반 테이블 수집은 서로 독립적이므로 병렬 실행
+    # - chunks -> 'chunks' 테이블로 분리
+    # - hypertables -> 'tables' 테이블 (hypertable_size()로 모든 청크 용량 포함)
+    # - tables -> 'tables' 테이블 (하이퍼테이블 루트 제외)
+    try:
+        collected, results = _collect_phases(pool, mode, state, max_connections)
+    finally:
+        pool.close()
+
+    chunks_data = collected["chunks"] # 청크 (분석용, 별도 저장)
+    hypertables = {(schema, name) for name, schema, *_ in collected["hypertables"]}
+    tables_data = collected["hypertables"] + [ # 하이퍼테이블 + 일반테이블 (대시보드용)
+        row for row in collected["tables"] if (row[1], row[0]) not in hypertables
+    ]
+    return tables_data, chunks_data, results, pool.round_trips
+
+def _write_target(sqlite_conn, target, cfg, tables_data, chunks_data):
+    """Replace `target`'s rows in SQLite and add today's log samples."""
     # A. tables 테이블 갱신 (하이퍼테이블 + 일반테이블)
-    sqlite_conn.execute("DELETE FROM tables")
+    sqlite_conn.execute("DELETE FROM tables WHERE target = ?", (target,))
     sqlite_conn.executemany(
-        "INSERT INTO tables(name, schema_name, table_type, actual_rows, is_compressed, table_size) VALUES (?, ?, ?, ?, ?, ?)",
-        tables_data
+        "INSERT INTO tables(target, name, schema_name, table_type, actual_rows, is_compressed, table_size) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(target,) + row for row in tables_data]
     )
 
     # B. chunks 테이블 갱신 (청크 데이터 별도 저장)
-    sqlite_conn.execute("DELETE FROM chunks")
+    sqlite_conn.execute("DELETE FROM chunks WHERE target = ?", (target,))
     sqlite_conn.executemany(
-        "INSERT INTO chunks(chunk_name, schema_name, hypertable_name, actual_rows, is_compressed, table_size) VALUES (?, ?, ?, ?, ?, ?)",
-        chunks_data
+        "INSERT INTO chunks(target, chunk_name, schema_name, hypertable_name, actual_rows, is_compressed, table_size, range_end, chunk_status, measured_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(target,) + row for row in chunks_data]
     )
 
-    # C. logs snapshot (tables_data 기준만 저장 - 일 평균 계산)
-    today = datetime.now().strftime("%Y-%m-%d")
-
-    for name, schema, _, rows, _, size in tables_data:
-        # 기존 데이터 확인
-        cursor = sqlite_conn.execute(
-            "SELECT row_count, table_size, sample_count FROM table_logs WHERE table_name = ? AND schema_name = ? AND date = ?",
-            (name, schema, today)
-        )
-        existing = cursor.fetchone()
-
-        if existing:
-            # 평균 계산: new_avg = (old_avg * old_count + new_value) / (old_count + 1)
-            old_rows, old_size, old_count = existing
-            new_count = old_count + 1
-            new_avg_rows = int((old_rows * old_count + rows) / new_count)
-            new_avg_size = int((old_size * old_count + size) / new_count)
-
-            sqlite_conn.execute(
-                "UPDATE table_logs SET row_count = ?, table_size = ?, sample_count = ? WHERE table_name = ? AND schema_name = ? AND date = ?",
-                (new_avg_rows, new_avg_size, new_count, name, schema, today)
-            )
-        else:
-            # 새로 삽입
-            sqlite_conn.execute(
-                "INSERT INTO table_logs(table_name, schema_name, date, row_count, table_size, sample_count) VALUES (?, ?, ?, ?, ?, ?)",
-                (name, schema, today, rows, size, 1)
-            )
+    # C. logs snapshot (tables_data 기준만 저장 - 원본 샘플 + 일별 평균 / min / max / last)
+    record_samples(sqlite_conn, target, tables_data)
 
     # D. run_info
-    sqlite_conn.execute("DELETE FROM run_info")
+    sqlite_conn.execute("DELETE FROM run_info WHERE target = ?", (target,))
     sqlite_conn.execute(
-        "INSERT INTO run_info(collected_at, mode, db_host, db_name) VALUES (?, ?, ?, ?)",
-        (_now_iso(), "prod", cfg["host"], cfg["database"])
+        "INSERT INTO run_info(target, collected_at, mode, db_host, db_name) VALUES (?, ?, ?, ?, ?)",
+        (target, _now_iso(), "prod", cfg["host"], cfg["database"])
     )
 
+def collect_prod_data(targets=None, mode="bulk", max_connections=None):
+    """Collect every target concurrently and store each under its target key.
+
+    A target is only written when every phase succeeded; otherwise its
+    previous rows (and incremental chunk state) are kept as they are.
+    Returns {target: {phase: PhaseResult}} for targets that could be reached.
+    """
+    if mode not in COLLECT_MODES:
+        raise ValueError(f"Unknown collect mode: {mode} (expected one of {', '.join(COLLECT_MODES)})")
+    max_connections = max(1, max_connections or COLLECT_MAX_CONNECTIONS)
+    targets = list(targets or _get_targets())
+
+    cfgs = {target: _get_prod_db_config(target) for target in targets}
+
+    sqlite_conn = sqlite3.connect(LOCAL_DB_PATH)
+    init_sqlite(sqlite_conn)
+
+    # SQLite 읽기/쓰기는 메인 스레드에서만 수행하고, 원격 수집만 병렬 실행
+    states = {
+        target: _load_chunk_state(sqlite_conn, target) if mode == "incremental" else None
+        for target in targets
+    }
+
+    print(f"Starting collection from {len(targets)} target(s) (mode: {mode}, connections per target: {max_connections})...")
+
+    outcomes = {}
+    with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+        futures = {
+            executor.submit(_collect_target, cfgs[target], mode, states[target], max_connections): target
+            for target in targets
+        }
+        for future in as_completed(futures):
+            target = futures[future]
+            try:
+                outcomes[target] = future.result()
+            except Exception as e:
+                # 접속 자체가 실패한 대상은 기존 데이터를 그대로 둔다
+                print(f"[{target}] Failed to collect: {e}")
+
+    # --- Write to SQLite ---
+    report = {}
+    for target in targets:
+        if target not in outcomes:
+            continue
+        tables_data, chunks_data, results, round_trips = outcomes[target]
+        print(f"[{target}] {cfgs[target]['host']}/{cfgs[target]['database']}")
+        _print_phase_report(results)
+        print(f"[{target}] Round trips: {round_trips}")
+        pipeline_metrics.add(round_trips=round_trips, rows=len(tables_data) + len(chunks_data))
+        report[target] = results
+        failed = [result.name for result in results.values() if not result.ok]
+        if failed:
+            # 일부 단계만 성공한 결과로 덮어쓰지 않고 이전 수집 결과를 유지
+            print(f"[{target}] FAILED ({', '.join(failed)}): previous rows kept, nothing written.")
+            continue
+        _write_target(sqlite_conn, target, cfgs[target], tables_data, chunks_data)
+        print(f"[{target}] Success: Collected {len(tables_data)} main tables and {len(chunks_data)} chunks.")
+
+    # E. 보관 기간이 지난 원본 샘플 삭제, 일별/주별 로그는 주별/월별 집계로 압축
+    prune_samples(sqlite_conn)
+    daily_rolled, weekly_rolled = compact_logs(sqlite_conn)
+    if daily_rolled or weekly_rolled:
+        print(f"Log rollup: {daily_rolled} daily rows -> weekly, {weekly_rolled} weekly rows -> monthly.")
+
     sqlite_conn.commit()
     sqlite_conn.close()
-    cur.close()
-    pg.close()
-
-    print(f"Success: Collected {len(tables_data)} main tables and {len(chunks_data)} chunks.")
+    return report
 
-def collect_metadata():
+def collect_metadata(mode="bulk", targets=None):
     # 더미 모드 제거됨 - 무조건 프로덕션 수집 실행
-    collect_prod_data()
+    return collect_prod_data(targets, mode)
 
 if __name__ == "__main__":
-    collect_metadata()
\ No newline at end of file
+    # 사용법: python collect_metadata.py [bulk|incremental|per-object] [target ...]
+    with pipeline_metrics.stage("collect") as metrics:
+        targets = sys.argv[2:] or None
+        report = collect_metadata(sys.argv[1] if len(sys.argv) > 1 else "bulk", targets)
+        # 접속 실패 또는 일부 단계 실패로 저장하지 못한 대상이 있으면 단계 상태를 failed 로 기록
+        if len(report) < len(targets or _get_targets()) or not all(
+            result.ok for results in report.values() for result in results.values()
+        ):
+            metrics.status = "failed"
@@ -1,14 +1,45 @@
 """Generate static HTML dashboard from DB monitoring logs."""
 
+import hashlib
+import re
 import sqlite3
+import sys
 import json
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
+
+from history import iter_history
+from sqlite_schema import init_sqlite, is_initialized
 
 # 스크립트 위치 기준 경로 설정
 SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_DIR = SCRIPT_DIR.parent.parent  # 3_monitoring/
 LOCAL_DB_PATH = SCRIPT_DIR / "db_monitoring.sqlite"
+# 테이블별 차트 이력 JSON (db.html 에서 차트를 열 때만 fetch)
+HISTORY_DIR = PROJECT_DIR / "db_history"
+# db.html / match.html 공용 가상 스크롤 테이블
+VIRTUAL_TABLE_JS = SCRIPT_DIR.parent / "common" / "virtual_table.js"
+# db.html 화면 스크립트 (내용 해시 이름의 자산으로 복사)
+APP_JS = SCRIPT_DIR / "static" / "db.js"
+sys.path.insert(0, str(SCRIPT_DIR.parent / "common"))
+
+import assets
+import jinja_env
+
+# 페이지에 컬럼 배열로 넣는 테이블 필드
+TABLE_COLUMNS = ("key", "target", "schema", "name", "type", "rows", "size", "compressed", "history")
+# db.html 결과에 영향을 주는 코드/템플릿 (input_digest 에 포함)
+SOURCE_FILES = (
+    Path(__file__).resolve(),
+    SCRIPT_DIR / "history.py",
+    SCRIPT_DIR / "sqlite_schema.py",
+    SCRIPT_DIR / "templates" / "index.html.jinja",
+    APP_JS,
+    VIRTUAL_TABLE_JS,
+    Path(assets.__file__).resolve(),
+    Path(jinja_env.__file__).resolve(),
+)
+# input_digest 에 포함하는 저장소 테이블 (db.html, db_history/ 의 원본)
+SOURCE_TABLES = ("tables", "table_logs", "table_log_rollups")
 
 def bytes_to_gb(bytes_val):
     """Convert bytes to GB with 2 decimal places."""
@@ -16,107 +47,195 @@ def bytes_to_gb(bytes_val):
         return 0.0
     return round(bytes_val / (1024 ** 3), 2)
 
-def collect_data():
-    """Collect data from SQLite for static HTML."""
-    if not Path(LOCAL_DB_PATH).exists():
-        return {"tables": [], "stats": {"total_tables": 0, "total_rows": 0}, "logs": {}}
+def _connect_ro():
+    return sqlite3.connect(f"file:{LOCAL_DB_PATH}?mode=ro", uri=True)
+
+def collect_data(target=None):
+    """Collect data from SQLite for static HTML.
 
-    conn = sqlite3.connect(LOCAL_DB_PATH)
+    With `target` only that target's rows are read; otherwise every target is
+    shown, and table keys are prefixed with the target name when there are
+    several.
+    """
+    if not Path(LOCAL_DB_PATH).exists():
+        return {"tables": [], "targets": [], "stats": {"total_tables": 0, "total_rows": 0, "total_size": 0.0}, "logs": {}}
+
+    # 읽기 전용 (스키마 생성/마이그레이션은 collect_metadata 만 수행 - 병렬 생성 중 잠금 방지)
+    conn = _connect_ro()
+    if not is_initialized(conn):
+        # 이전 버전이 쓴 저장소는 메모리 사본에만 마이그레이션 적용 (파일은 그대로)
+        memory = sqlite3.connect(":memory:")
+        conn.backup(memory)
+        conn.close()
+        conn = memory
+        init_sqlite(conn)
     cursor = conn.cursor()
 
     # Get tables (size in GB)
     # [수정됨] collect_metadata.py가 이미 청크를 제외한 'tables'만 저장하므로
     # 별도의 필터링이나 합산 로직 없이 그대로 가져옵니다.
-    cursor.execute("SELECT name, schema_name, table_type, actual_rows, is_compressed, table_size FROM tables ORDER BY schema_name, name")
+    where, params = ("WHERE target = ?", (target,)) if target else ("", ())
+    cursor.execute(f"""
+        SELECT target, name, schema_name, table_type, actual_rows, is_compressed, table_size FROM tables
+        {where}
+        ORDER BY target, schema_name, name
+    """, params)
+    rows = cursor.fetchall()
+    targets = sorted({row[0] for row in rows})
+    multi_target = len(targets) > 1
     tables = [
         {
-            "name": row[0],
-            "schema": row[1],
-            "type": row[2],
-            "rows": row[3],
-            "compressed": row[4],
-            "size": bytes_to_gb(row[5])  # bytes → GB
+            "key": f"{row[0]}:{row[2]}.{row[1]}" if multi_target else f"{row[2]}.{row[1]}",
+            "target": row[0],
+            "name": row[1],
+            "schema": row[2],
+            "type": row[3],
+            "rows": row[4],
+            "compressed": row[5],
+            "size": bytes_to_gb(row[6]),  # bytes → GB
+            "bytes": row[6] or 0
         }
-        for row in cursor.fetchall()
+        for row in rows
     ]
 
     # [삭제됨] 여기에 있던 _all_chunks 합산 로직(chunk_tables, aggregated 등)을 모두 제거했습니다.
 
     # Get stats
     # tables 리스트에 중복(청크)이 없으므로 단순 합계가 곧 전체 용량입니다.
+    cursor.execute(f"SELECT COUNT(*), COALESCE(SUM(actual_rows), 0), COALESCE(SUM(table_size), 0) FROM tables {where}", params)
+    total_tables, total_rows, total_bytes = cursor.fetchone()
     stats = {
-        "total_tables": len(tables),
-        "total_rows": sum(int(t.get("rows") or 0) for t in tables),
-        "total_size": sum(float(t.get("size") or 0) for t in tables),
+        "total_tables": total_tables,
+        "total_rows": total_rows,
+        "total_size": bytes_to_gb(total_bytes),
     }
 
-    # Get logs for each table
+    # Get logs for all tables in one ordered query (월별 -> 주별 -> 일별 순으로 이어진 이력)
+    # 테이블별 컬럼 배열 형태: {"period": [...], "date": [...], "size": [...], ...}
+    keys = {(t['target'], t['schema'], t['name']): t['key'] for t in tables}
     logs = {}
-    for table in tables:
-        key = f"{table['schema']}.{table['name']}"
-        cursor.execute("""
-            SELECT date, row_count, table_size FROM table_logs
-            WHERE table_name = ? AND schema_name = ?
-            ORDER BY date
-        """, (table['name'], table['schema']))
-        logs[key] = [{"date": row[0], "rows": row[1], "size": bytes_to_gb(row[2])} for row in cursor.fetchall()]
+    for table_key, history in iter_history(conn, target):
+        if table_key not in keys:
+            continue  # 더 이상 존재하지 않는 테이블의 이력
+        period, date, rows, size, size_min, size_max, size_last = zip(*history)
+        logs[keys[table_key]] = {
+            "period": period,
+            "date": date,
+            "rows": rows,
+            "size": [bytes_to_gb(v) for v in size],
+            "size_min": [bytes_to_gb(v) for v in size_min],
+            "size_max": [bytes_to_gb(v) for v in size_max],
+            "size_last": [bytes_to_gb(v) for v in size_last],
+        }
 
     conn.close()
-    return {"tables": tables, "stats": stats, "logs": logs}
-
-def inject_sorting_js(html: str) -> str:
-    """Inject sortable table JS without changing template/design."""
-    js = """
-<script>
-(function () {
-  function getCellValue(tr, idx) {
-    return tr.children[idx].innerText.trim();
-  }
-
-  function comparer(idx, asc) {
-    return function (a, b) {
-      const v1 = getCellValue(asc ? a : b, idx);
-      const v2 = getCellValue(asc ? b : a, idx);
-
-      const n1 = parseFloat(v1.replace(/[^0-9.-]/g, ''));
-      const n2 = parseFloat(v2.replace(/[^0-9.-]/g, ''));
-
-      if (!isNaN(n1) && !isNaN(n2)) return n1 - n2;
-      return v1.localeCompare(v2, undefined, {numeric: true, sensitivity: 'base'});
-    };
-  }
-
-  document.addEventListener('DOMContentLoaded', function () {
-    document.querySelectorAll('table thead th').forEach(function (th, idx) {
-      let asc = true;
-      th.style.cursor = 'pointer';
-      th.addEventListener('click', function () {
-        const table = th.closest('table');
-        const tbody = table.querySelector('tbody');
-        Array.from(tbody.querySelectorAll('tr'))
-          .sort(comparer(idx, asc = !asc))
-          .forEach(tr => tbody.appendChild(tr));
-      });
-    });
-  });
-})();
-</script>
-"""
-    return html.replace("</body>", js + "\n</body>")
-
-
-def generate_html():
-    data = collect_data()
-    env = Environment(loader=FileSystemLoader(SCRIPT_DIR / 'templates'))
-    template = env.get_template('index.html.jinja')
-    html = template.render(data=data)
-    html = inject_sorting_js(html)
-
-    with open(PROJECT_DIR / 'db.html', 'w') as f:
-        f.write(html)
-
-    print("Generated db.html")
+    return {"tables": tables, "targets": targets, "stats": stats, "logs": logs}
+
+def input_digest():
+    """Hash of everything db.html and db_history/ are built from (store rows, templates, code)."""
+    digest = hashlib.sha1()
+    for path in SOURCE_FILES:
+        digest.update(path.read_bytes())
+    if Path(LOCAL_DB_PATH).exists():
+        conn = _connect_ro()
+        for table in SOURCE_TABLES:
+            digest.update(table.encode("utf-8"))
+            try:
+                for row in conn.execute(f"SELECT * FROM {table} ORDER BY rowid"):
+                    digest.update(repr(row).encode("utf-8"))
+            except sqlite3.OperationalError:
+                pass  # 아직 생성되지 않은 테이블
+        conn.close()
+    return digest.hexdigest()
+
+def _history_file_name(table):
+    """Stable file name for a table's history, independent of the page's key format."""
+    identity = f"{table['target']}\0{table['schema']}\0{table['name']}"
+    return hashlib.sha1(identity.encode("utf-8")).hexdigest()[:16] + ".json"
+
+def write_history_files(data, prune=False):
+    """Write one compact JSON file per table plus manifest.json into HISTORY_DIR.
+
+    Sets table["history"] to the file name for tables that have history.
+    Files are rewritten only when their content changed; with `prune`,
+    files no longer listed in the manifest are removed.
+    """
+    HISTORY_DIR.mkdir(exist_ok=True)
+    manifest = {}
+    for table in data["tables"]:
+        history = data["logs"].get(table["key"])
+        if not history:
+            continue
+        file_name = _history_file_name(table)
+        payload = json.dumps(history, separators=(",", ":"), ensure_ascii=False)
+        jinja_env.write_if_changed(HISTORY_DIR / file_name, payload)
+        table["history"] = file_name
+        manifest[f"{table['target']}:{table['schema']}.{table['name']}"] = file_name
+
+    manifest_path = HISTORY_DIR / "manifest.json"
+    if prune:
+        keep = set(manifest.values()) | {manifest_path.name}
+        for path in HISTORY_DIR.glob("*.json"):
+            if path.name not in keep:
+                path.unlink()
+    else:
+        # 단일 대상 생성 시에는 다른 대상의 항목을 유지
+        if manifest_path.exists():
+            manifest = {**json.loads(manifest_path.read_text(encoding="utf-8")), **manifest}
+    jinja_env.write_if_changed(manifest_path, json.dumps(manifest, separators=(",", ":"), sort_keys=True, ensure_ascii=False))
+
+def table_columns(tables):
+    """Column arrays ({field: [value per table]}) rendered by the page's virtual table."""
+    return {column: [table.get(column) for table in tables] for column in TABLE_COLUMNS}
+
+def _natural_key(value):
+    """Case-insensitive key comparing digit runs as numbers ('t_9' < 't_10')."""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", (value or "").casefold())]
+
+def _ranks(values):
+    """Rank of each value in natural order (equal values share a rank)."""
+    order = sorted(set(values), key=lambda value: (_natural_key(value), value or ""))
+    rank = {value: i for i, value in enumerate(order)}
+    return [rank[value] for value in values]
+
+def table_sort_keys(tables):
+    """Numeric sort key per sortable column: name ranks, raw row counts and raw bytes.
+
+    The page sorts by indexing into these arrays instead of parsing cell text.
+    """
+    return {
+        "target": _ranks([table["target"] for table in tables]),
+        "schema": _ranks([table["schema"] for table in tables]),
+        "name": _ranks([table["name"] for table in tables]),
+        "type": _ranks([table["type"] for table in tables]),
+        "rows": [table["rows"] if table["rows"] is not None else -1 for table in tables],
+        "size": [table["bytes"] for table in tables],
+        "compressed": [1 if table["compressed"] else 0 for table in tables],
+    }
+
+
+def generate_html(target=None):
+    """Render db.html (all targets) or db_<target>.html (one target)."""
+    data = collect_data(target)
+    write_history_files(data, prune=target is None)
+    output = f"db_{target}.html" if target else "db.html"
+    page_data = {
+        "columns": table_columns(data["tables"]),
+        "sortKeys": table_sort_keys(data["tables"]),
+        "multiTarget": len(data["targets"]) > 1,
+    }
+    # 스크립트와 테이블 데이터는 내용 해시 이름의 자산, db.html 은 이를 참조하는 작은 셸
+    urls = assets.write_assets(Path(output).stem, {
+        "virtual_table": (VIRTUAL_TABLE_JS.read_text(encoding="utf-8"), "js"),
+        "data": (f"var DB_DATA = {json.dumps(page_data, ensure_ascii=False, separators=(',', ':'))};\n", "js"),
+        "app": (APP_JS.read_text(encoding="utf-8"), "js"),
+    })
+    if jinja_env.render_to_file("db/index.html.jinja", PROJECT_DIR / output, data=data, assets=urls):
+        print(f"Generated {output}")
+    else:
+        print(f"{output} unchanged")
 
 
 if __name__ == "__main__":
-    generate_html()
\ No newline at end of file
+    # 사용법: python generate_static_html.py [target]
+    generate_html(sys.argv[1] if len(sys.argv) > 1 else None)
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""Table size/row history: daily samples, tiered rollups and retention.
+
+Tiers (oldest data is the coarsest):
+- sample  : table_samples, every collected value, kept for LOG_RAW_RETENTION_DAYS
+- daily   : table_logs, one row per table per day, aggregated from the samples
+- week    : table_log_rollups, daily rows older than LOG_DAILY_RETENTION_DAYS
+- month   : table_log_rollups, weekly rows older than LOG_WEEKLY_RETENTION_DAYS
+
+Every tier keeps avg / min / max / last for rows and size, so history can be
+compacted without losing the range of values.
+"""
+
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+
+# 원본 샘플 보관 기간 (일별 통계는 샘플에서 계산되므로 지난 날짜는 삭제해도 됨)
+LOG_RAW_RETENTION_DAYS = int(os.getenv("LOG_RAW_RETENTION_DAYS", "14"))
+# 일별 행 보관 기간 (이후 주별 집계로 압축)
+LOG_DAILY_RETENTION_DAYS = int(os.getenv("LOG_DAILY_RETENTION_DAYS", "120"))
+# 주별 집계 보관 기간 (이후 월별 집계로 압축, 월별은 영구 보관)
+LOG_WEEKLY_RETENTION_DAYS = int(os.getenv("LOG_WEEKLY_RETENTION_DAYS", "730"))
+
+# 집계 병합: 평균은 sample_count 가중, last 는 더 최근 날짜 쪽 값 사용
+_ROLLUP_MERGE = """
+    ON CONFLICT(target, schema_name, table_name, period, period_start) DO UPDATE SET
+        row_count = (table_log_rollups.row_count * table_log_rollups.sample_count + excluded.row_count * excluded.sample_count)
+                    / (table_log_rollups.sample_count + excluded.sample_count),
+        table_size = (table_log_rollups.table_size * table_log_rollups.sample_count + excluded.table_size * excluded.sample_count)
+                     / (table_log_rollups.sample_count + excluded.sample_count),
+        row_min = MIN(table_log_rollups.row_min, excluded.row_min),
+        row_max = MAX(table_log_rollups.row_max, excluded.row_max),
+        size_min = MIN(table_log_rollups.size_min, excluded.size_min),
+        size_max = MAX(table_log_rollups.size_max, excluded.size_max),
+        row_last = CASE WHEN excluded.last_date >= table_log_rollups.last_date
+                        THEN excluded.row_last ELSE table_log_rollups.row_last END,
+        size_last = CASE WHEN excluded.last_date >= table_log_rollups.last_date
+                         THEN excluded.size_last ELSE table_log_rollups.size_last END,
+        last_date = MAX(table_log_rollups.last_date, excluded.last_date),
+        sample_count = table_log_rollups.sample_count + excluded.sample_count
+"""
+
+
+def _table_ids(conn: sqlite3.Connection, target, tables_data):
+    """Return {(schema, name): table_id} for `tables_data`, registering new tables."""
+    conn.executemany(
+        "INSERT OR IGNORE INTO table_ids(target, schema_name, table_name) VALUES (?, ?, ?)",
+        [(target, schema, name) for name, schema, *_ in tables_data]
+    )
+    cursor = conn.execute("SELECT table_id, schema_name, table_name FROM table_ids WHERE target = ?", (target,))
+    return {(schema, name): table_id for table_id, schema, name in cursor.fetchall()}
+
+
+def record_samples(conn: sqlite3.Connection, target, tables_data, ts=None):
+    """Append one raw sample per table and refresh that day's table_logs rows.
+
+    The daily row is recomputed from the day's samples with an aggregate over
+    the (table_id, ts) primary key, so averages carry no accumulated rounding.
+    """
+    ts = int(ts if ts is not None else time.time())
+    day = datetime.fromtimestamp(ts).date()
+    day_start = int(datetime.combine(day, datetime.min.time()).timestamp())
+    day_end = int(datetime.combine(day + timedelta(days=1), datetime.min.time()).timestamp())
+
+    ids = _table_ids(conn, target, tables_data)
+    conn.executemany(
+        "INSERT OR REPLACE INTO table_samples(table_id, ts, row_count, table_size) VALUES (?, ?, ?, ?)",
+        [(ids[(schema, name)], ts, rows, size) for name, schema, _, rows, _, size in tables_data]
+    )
+
+    # 일별 통계 = 그날 샘플의 평균 / min / max / last
+    # (업그레이드 당일처럼 기존 누적 평균의 샘플 수가 더 많으면 기존 행 유지)
+    conn.executemany("""
+        INSERT INTO table_logs(target, table_name, schema_name, date, row_count, table_size, sample_count,
+                               row_min, row_max, row_last, size_min, size_max, size_last)
+        SELECT i.target, i.table_name, i.schema_name, :day,
+               CAST(ROUND(AVG(s.row_count)) AS INTEGER), CAST(ROUND(AVG(s.table_size)) AS INTEGER), COUNT(*),
+               MIN(s.row_count), MAX(s.row_count), l.row_count,
+               MIN(s.table_size), MAX(s.table_size), l.table_size
+        FROM table_samples s
+        JOIN table_ids i ON i.table_id = s.table_id
+        JOIN (
+            SELECT row_count, table_size FROM table_samples
+            WHERE table_id = :id AND ts >= :start AND ts < :end
+            ORDER BY ts DESC LIMIT 1
+        ) l
+        WHERE s.table_id = :id AND s.ts >= :start AND s.ts < :end
+        GROUP BY s.table_id
+        ON CONFLICT(target, schema_name, table_name, date) DO UPDATE SET
+            row_count = excluded.row_count,
+            table_size = excluded.table_size,
+            sample_count = excluded.sample_count,
+            row_min = excluded.row_min,
+            row_max = excluded.row_max,
+            row_last = excluded.row_last,
+            size_min = excluded.size_min,
+            size_max = excluded.size_max,
+            size_last = excluded.size_last
+        WHERE excluded.sample_count >= table_logs.sample_count
+    """, [
+        {"id": ids[(schema, name)], "day": day.isoformat(), "start": day_start, "end": day_end}
+        for name, schema, *_ in tables_data
+    ])
+
+
+def prune_samples(conn: sqlite3.Connection, now=None):
+    """Drop raw samples older than LOG_RAW_RETENTION_DAYS; returns rows deleted."""
+    now = now if now is not None else time.time()
+    cutoff = int(now - LOG_RAW_RETENTION_DAYS * 86400)
+    return conn.execute("DELETE FROM table_samples WHERE ts < ?", (cutoff,)).rowcount
+
+
+def _week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def compact_logs(conn: sqlite3.Connection, today=None):
+    """Roll old daily rows into weeks and old weeks into months, then drop them.
+
+    Cutoffs are aligned to week/month starts so only complete periods are
+    rolled up. Returns (daily rows rolled, weekly rows rolled).
+    """
+    today = today or datetime.now().date()
+    daily_cutoff = _week_start(today - timedelta(days=LOG_DAILY_RETENTION_DAYS)).isoformat()
+    weekly_cutoff = (today - timedelta(days=LOG_WEEKLY_RETENTION_DAYS)).replace(day=1).isoformat()
+
+    # 1) 일별 -> 주별 (주 시작 = 월요일)
+    conn.execute(f"""
+        INSERT INTO table_log_rollups(target, schema_name, table_name, period, period_start, last_date,
+                                      row_count, row_min, row_max, row_last,
+                                      table_size, size_min, size_max, size_last, sample_count)
+        SELECT target, schema_name, table_name, 'week', period_start, MAX(date),
+               SUM(row_count * sample_count) / SUM(sample_count), MIN(row_min), MAX(row_max), MAX(p_row_last),
+               SUM(table_size * sample_count) / SUM(sample_count), MIN(size_min), MAX(size_max), MAX(p_size_last),
+               SUM(sample_count)
+        FROM (
+            SELECT *,
+                   date(date, '-6 days', 'weekday 1') AS period_start,
+                   FIRST_VALUE(row_last) OVER w AS p_row_last,
+                   FIRST_VALUE(size_last) OVER w AS p_size_last
+            FROM table_logs
+            WHERE date < ?
+            WINDOW w AS (PARTITION BY target, schema_name, table_name, date(date, '-6 days', 'weekday 1')
+                         ORDER BY date DESC)
+        )
+        WHERE true
+        GROUP BY target, schema_name, table_name, period_start
+        {_ROLLUP_MERGE}
+    """, (daily_cutoff,))
+    daily_rolled = conn.execute("DELETE FROM table_logs WHERE date < ?", (daily_cutoff,)).rowcount
+
+    # 2) 주별 -> 월별 (주 시작일이 속한 달로 집계)
+    conn.execute(f"""
+        INSERT INTO table_log_rollups(target, schema_name, table_name, period, period_start, last_date,
+                                      row_count, row_min, row_max, row_last,
+                                      table_size, size_min, size_max, size_last, sample_count)
+        SELECT target, schema_name, table_name, 'month', month_start, MAX(last_date),
+               SUM(row_count * sample_count) / SUM(sample_count), MIN(row_min), MAX(row_max), MAX(p_row_last),
+               SUM(table_size * sample_count) / SUM(sample_count), MIN(size_min), MAX(size_max), MAX(p_size_last),
+               SUM(sample_count)
+        FROM (
+            SELECT *,
+                   strftime('%Y-%m-01', period_start) AS month_start,
+                   FIRST_VALUE(row_last) OVER w AS p_row_last,
+                   FIRST_VALUE(size_last) OVER w AS p_size_last
+            FROM table_log_rollups
+            WHERE period = 'week' AND period_start < ?
+            WINDOW w AS (PARTITION BY target, schema_name, table_name, strftime('%Y-%m-01', period_start)
+                         ORDER BY last_date DESC)
+        )
+        WHERE true
+        GROUP BY target, schema_name, table_name, month_start
+        {_ROLLUP_MERGE}
+    """, (weekly_cutoff,))
+    weekly_rolled = conn.execute(
+        "DELETE FROM table_log_rollups WHERE period = 'week' AND period_start < ?", (weekly_cutoff,)
+    ).rowcount
+
+    return daily_rolled, weekly_rolled
+
+
+def iter_history(conn: sqlite3.Connection, target=None):
+    """Yield ((target, schema, table), rows) for every table's history in one query.
+
+    Rows are (period, date, row_count, table_size, size_min, size_max,
+    size_last), oldest first. Tiers never overlap in time (see compact_logs),
+    so the chart range gets monthly points for old history, weekly for the
+    middle and daily for the most recent days. The result is streamed from a
+    single ordered UNION and grouped in one pass.
+    """
+    where, params = ("WHERE target = ?", (target,)) if target else ("", ())
+    cursor = conn.execute(f"""
+        SELECT target, schema_name, table_name, period, date, row_count, table_size, size_min, size_max, size_last
+        FROM (
+            SELECT target, schema_name, table_name, period, period_start AS date,
+                   row_count, table_size, size_min, size_max, size_last
+            FROM table_log_rollups {where}
+            UNION ALL
+            SELECT target, schema_name, table_name, 'day', date,
+                   row_count, table_size, size_min, size_max, size_last
+            FROM table_logs {where}
+        )
+        ORDER BY target, schema_name, table_name, date
+    """, params * 2)
+    for key, group in groupby(cursor, key=itemgetter(0, 1, 2)):
+        yield key, [row[3:] for row in group]
@@ -0,0 +1,175 @@
+"""SQLite schema of the local monitoring store (db_monitoring.sqlite).
+
+Only the collector creates and migrates the store file (init_sqlite). The
+HTML generator opens it read-only and, when is_initialized says a store
+written by an older collector has not been migrated yet, migrates an
+in-memory copy instead.
+"""
+
+import sqlite3
+
+# 수집 대상 DB 키. PROD_DB_TARGETS 미설정 시 PROD_DB_* 단일 대상을 이 키로 저장
+DEFAULT_TARGET = "default"
+
+# init_sqlite 가 마지막으로 만드는 테이블 (있으면 모든 마이그레이션이 적용된 저장소)
+_LAST_CREATED_TABLE = "table_samples"
+
+def is_initialized(conn: sqlite3.Connection) -> bool:
+    """Return True if init_sqlite has run on this store with the current schema."""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (_LAST_CREATED_TABLE,)
+    ).fetchone() is not None
+
+def init_sqlite(conn: sqlite3.Connection):
+    """Create tables and apply migrations; safe to call on every open."""
+    # 1. 메인 테이블 정보 (하이퍼테이블 & 일반 테이블) - 대시보드 표시용
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS tables (
+            target TEXT NOT NULL DEFAULT 'default',
+            name TEXT,
+            schema_name TEXT,
+            table_type TEXT,
+            actual_rows INTEGER,
+            is_compressed BOOLEAN DEFAULT FALSE,
+            table_size INTEGER
+        )
+    """)
+    
+    # 2. 청크 정보 별도 분리 - 상세 분석용 (대시보드 합산 제외)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS chunks (
+            target TEXT NOT NULL DEFAULT 'default',
+            chunk_name TEXT,
+            schema_name TEXT,
+            hypertable_name TEXT,
+            actual_rows INTEGER,
+            is_compressed BOOLEAN DEFAULT FALSE,
+            table_size INTEGER
+        )
+    """)
+
+    # 3. 로그 테이블 (메인 테이블 기준 이력)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS table_logs (
+            target TEXT NOT NULL DEFAULT 'default',
+            table_name TEXT,
+            schema_name TEXT,
+            date TEXT,
+            row_count INTEGER,
+            table_size INTEGER,
+            sample_count INTEGER DEFAULT 1
+        )
+    """)
+
+    # Migration: Add sample_count column if it doesn't exist
+    try:
+        conn.execute("ALTER TABLE table_logs ADD COLUMN sample_count INTEGER DEFAULT 1")
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+
+    # Migration: incremental 수집용 청크 상태 컬럼 (범위 끝, 마지막 측정 시각)
+    for column in ("range_end TEXT", "chunk_status INTEGER", "measured_at TEXT"):
+        try:
+            conn.execute(f"ALTER TABLE chunks ADD COLUMN {column}")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+
+    # 4. 실행 정보
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS run_info (
+            target TEXT NOT NULL DEFAULT 'default',
+            collected_at TEXT,
+            mode TEXT,
+            db_host TEXT,
+            db_name TEXT
+        )
+    """)
+
+    # Migration: 대상 DB 키 컬럼 (기존 행은 'default' 대상으로 간주)
+    for table in ("tables", "chunks", "table_logs", "run_info"):
+        try:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN target TEXT NOT NULL DEFAULT 'default'")
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tables_target ON tables(target, schema_name, name)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_target ON chunks(target)")
+
+    # Migration: table_logs 유니크 키 (대상, 스키마, 테이블, 날짜) + 날짜 인덱스
+    # 유니크 인덱스 생성 전 한 번만 중복 행 정리 (가장 마지막에 쓰인 행 유지)
+    has_unique = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'ux_table_logs_key'"
+    ).fetchone()
+    if not has_unique:
+        conn.execute("""
+            DELETE FROM table_logs WHERE rowid NOT IN (
+                SELECT MAX(rowid) FROM table_logs
+                GROUP BY target, schema_name, table_name, date
+            )
+        """)
+        conn.execute("""
+            CREATE UNIQUE INDEX ux_table_logs_key
+            ON table_logs(target, schema_name, table_name, date)
+        """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_table_logs_date ON table_logs(date)")
+
+    # Migration: 일별 로그에 min / max / last 컬럼 추가 (기존 행은 평균값으로 채움)
+    added = False
+    for column in ("row_min", "row_max", "row_last", "size_min", "size_max", "size_last"):
+        try:
+            conn.execute(f"ALTER TABLE table_logs ADD COLUMN {column} INTEGER")
+            added = True
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+    if added:
+        conn.execute("""
+            UPDATE table_logs SET
+                row_min = row_count, row_max = row_count, row_last = row_count,
+                size_min = table_size, size_max = table_size, size_last = table_size
+            WHERE row_last IS NULL
+        """)
+
+    # 5. 로그 집계 (오래된 일별 로그를 주별/월별로 압축 - history.compact_logs)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS table_log_rollups (
+            target TEXT NOT NULL DEFAULT 'default',
+            schema_name TEXT,
+            table_name TEXT,
+            period TEXT,
+            period_start TEXT,
+            last_date TEXT,
+            row_count INTEGER,
+            row_min INTEGER,
+            row_max INTEGER,
+            row_last INTEGER,
+            table_size INTEGER,
+            size_min INTEGER,
+            size_max INTEGER,
+            size_last INTEGER,
+            sample_count INTEGER,
+            PRIMARY KEY (target, schema_name, table_name, period, period_start)
+        )
+    """)
+    conn.commit()
+
+    # 6. 원본 샘플 (수집 1회 = 테이블당 1행, append-only)
+    # 테이블 이름 반복 저장 대신 table_ids 의 정수 id 참조, 시각은 unix 초
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS table_ids (
+            table_id INTEGER PRIMARY KEY,
+            target TEXT NOT NULL DEFAULT 'default',
+            schema_name TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            UNIQUE (target, schema_name, table_name)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS table_samples (
+            table_id INTEGER NOT NULL REFERENCES table_ids(table_id),
+            ts INTEGER NOT NULL,
+            row_count INTEGER,
+            table_size INTEGER,
+            PRIMARY KEY (table_id, ts)
+        ) WITHOUT ROWID
+    """)
+    conn.commit()
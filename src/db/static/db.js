@@ -0,0 +1,150 @@
+// db.html 화면 스크립트 (generate_static_html.py 가 내용 해시 이름의 자산으로 복사)
+// DB_DATA: 테이블 컬럼 배열 / 정렬 키 (assets/db/data.*.js 에서 정의)
+let chart = null;
+
+// 테이블 목록 (필드별 컬럼 배열) - 보이는 행만 렌더링
+const tableColumns = DB_DATA.columns;
+// 열별 정렬 키 (생성 시 계산: 이름 순위, 원본 행 수, 원본 바이트)
+const sortKeys = DB_DATA.sortKeys;
+const multiTarget = DB_DATA.multiTarget;
+const tableBody = document.querySelector('#tables-table tbody');
+const esc = VirtualTable.escape;
+
+const virtualTable = new VirtualTable({
+    scroller: document.getElementById('tables-scroll'),
+    body: tableBody,
+    columns: multiTarget ? 7 : 6,
+    renderRow: row => {
+        const c = tableColumns;
+        return `<tr data-row="${row}" class="${c.compressed[row] ? 'compressed' : ''}">`
+            + (multiTarget ? `<td>${esc(c.target[row])}</td>` : '')
+            + `<td>${esc(c.schema[row])}</td>`
+            + `<td>${esc(c.name[row])}</td>`
+            + `<td><span class="badge badge-${esc(c.type[row])}">${esc(c.type[row])}</span></td>`
+            + `<td>${c.rows[row] === null ? '' : c.rows[row]}</td>`
+            + `<td>${c.size[row]}</td>`
+            + `<td>${c.compressed[row] ? 'Yes' : 'No'}</td>`
+            + '</tr>';
+    }
+});
+virtualTable.setRows(tableColumns.key.length);
+
+// 헤더 클릭 정렬 (첫 클릭은 내림차순)
+document.querySelectorAll('#tables-table th[data-sort]').forEach(th => {
+    let asc = true;
+    th.addEventListener('click', () => virtualTable.sortBy(sortKeys[th.dataset.sort], asc = !asc));
+});
+
+// 테이블별 이력은 차트를 열 때 db_history/ 에서 가져와 캐시
+const historyCache = new Map();
+function loadHistory(file) {
+    if (!historyCache.has(file)) {
+        const request = fetch('db_history/' + file).then(response => {
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            return response.json();
+        });
+        request.catch(() => historyCache.delete(file));
+        historyCache.set(file, request);
+    }
+    return historyCache.get(file);
+}
+
+// Modal elements
+const modal = document.getElementById('table-modal');
+const closeBtn = document.querySelector('.close');
+
+// Close modal
+closeBtn.onclick = function() {
+    modal.style.display = "none";
+}
+window.onclick = function(event) {
+    if (event.target == modal) {
+        modal.style.display = "none";
+    }
+}
+
+// Table row click (행은 다시 렌더링되므로 tbody 에서 위임 처리)
+tableBody.addEventListener('click', function(event) {
+    const tr = event.target.closest('tr[data-row]');
+    if (!tr) return;
+    const row = Number(tr.dataset.row);
+    const tableKey = tableColumns.key[row];
+    const file = tableColumns.history[row];
+    if (!file) return;
+
+    loadHistory(file)
+        .then(history => showChart(tableKey, history))
+        .catch(error => console.error(`Failed to load history for ${tableKey}:`, error));
+});
+
+function showChart(tableKey, history) {
+    if (!history.date || history.date.length === 0) return;
+
+    document.getElementById('modal-title').textContent = `Growth Chart: ${tableKey}`;
+
+    if (chart) chart.destroy();
+
+    // 집계 구간별 라벨: 월별 YYYY-MM, 주별 YYYY-MM-DD~, 일별 YYYY-MM-DD
+    const labels = history.date.map((date, i) =>
+        history.period[i] === 'month' ? date.slice(0, 7) :
+        history.period[i] === 'week' ? date + '~' : date);
+    const sizeData = history.size;
+
+    const ctx = document.getElementById('growth-chart').getContext('2d');
+    chart = new Chart(ctx, {
+        type: 'line',
+        data: {
+            labels: labels,
+            datasets: [
+                {
+                    label: 'Size (GB)',
+                    data: sizeData,
+                    borderColor: 'rgb(255, 99, 132)',
+                    backgroundColor: 'rgba(255, 99, 132, 0.1)',
+                    borderWidth: 2,
+                    tension: 0.1,
+                    fill: true
+                }
+            ]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            interaction: {
+                mode: 'index',
+                intersect: false,
+            },
+            plugins: {
+                tooltip: {
+                    callbacks: {
+                        label: function(context) {
+                            return context.parsed.y + ' GB';
+                        },
+                        afterLabel: function(context) {
+                            const i = context.dataIndex;
+                            return `min ${history.size_min[i]} / max ${history.size_max[i]} / last ${history.size_last[i]} GB`;
+                        }
+                    }
+                }
+            },
+            scales: {
+                y: {
+                    type: 'linear',
+                    display: true,
+                    beginAtZero: true,
+                    title: {
+                        display: true,
+                        text: 'Size (GB)'
+                    },
+                    ticks: {
+                        callback: function(value) {
+                            return value + ' GB';
+                        }
+                    }
+                }
+            }
+        }
+    });
+
+    modal.style.display = "block";
+}
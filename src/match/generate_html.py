@@ -1,431 +1,277 @@
 #!/usr/bin/env python3
 """
-data.txt를 읽어서 HTML 파일을 자동 생성하는 스크립트
+매칭 데이터 저장소(match.sqlite)를 읽어서 HTML 파일을 자동 생성하는 스크립트
 EVNSOLUTION 차량 매칭 현황
 사용법: python3 generate_html.py
 """
 
+import hashlib
+import json
 import os
-from collections import defaultdict
+import sqlite3
+import sys
+from array import array
+from dataclasses import dataclass, field
 from datetime import datetime
+from itertools import groupby
+
+import match_store
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-PROJECT_DIR = os.path.dirname(os.path.dirname(SCRIPT_DIR))  # 3_monitoring/
-DATA_FILE = os.path.join(SCRIPT_DIR, "data.txt")
-HTML_FILE = os.path.join(PROJECT_DIR, "match.html")
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPT_DIR), "common"))
 
+import assets
+import jinja_env
 
-def parse_data():
-    """data.txt 파싱 (차량 기준)"""
-    data = defaultdict(list)
-
-    with open(DATA_FILE, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-
-            parts = line.split('|')
-            if len(parts) < 5:
-                continue
-
-            date, vehicle, op_type, driver = parts[:4]
-            start_time = parts[4] if len(parts) > 4 else ''
-            end_time = parts[5] if len(parts) > 5 else ''
-            fleet = parts[6] if len(parts) > 6 else ''
-
-            data[date].append({
-                'vehicle': vehicle,
-                'type': op_type if op_type else None,
-                'driver': driver if driver else None,
-                'start': start_time if start_time else None,
-                'end': end_time if end_time else None,
-                'fleet': fleet if fleet else None
-            })
-
-    return dict(data)
-
-
-def generate_html(data):
-    """HTML 생성"""
-    js_data_items = []
-    for date in sorted(data.keys()):
-        items = data[date]
-        item_strs = []
-        for item in items:
-            type_str = f'"{item["type"]}"' if item['type'] else 'null'
-            driver_str = f'"{item["driver"]}"' if item['driver'] else 'null'
-            start_str = f'"{item["start"]}"' if item['start'] else 'null'
-            end_str = f'"{item["end"]}"' if item['end'] else 'null'
-            fleet_str = f'"{item["fleet"]}"' if item['fleet'] else 'null'
-            item_strs.append(
-                f'{{ vehicle: "{item["vehicle"]}", type: {type_str}, driver: {driver_str}, start: {start_str}, end: {end_str}, fleet: {fleet_str} }}'
-            )
-        js_data_items.append(
-            f'            "{date}": [\n                ' +
-            ',\n                '.join(item_strs) +
-            '\n            ]'
-        )
-
-    js_data = '{\n' + ',\n'.join(js_data_items) + '\n        }'
+PROJECT_DIR = os.path.dirname(os.path.dirname(SCRIPT_DIR))  # 3_monitoring/
+HTML_FILE = os.path.join(PROJECT_DIR, "match.html")
+# 날짜별 데이터 shard (match.html 에서 선택한 날짜만 fetch)
+MATCH_DATA_DIR = os.path.join(PROJECT_DIR, "match_data")
+INDEX_FILE = os.path.join(MATCH_DATA_DIR, "index.json")
+# db.html / match.html 공용 가상 스크롤 테이블
+VIRTUAL_TABLE_JS = os.path.join(os.path.dirname(SCRIPT_DIR), "common", "virtual_table.js")
+# 공용 Jinja 환경의 템플릿 이름과 원본 파일
+MATCH_TEMPLATE = "match/match.html.jinja"
+TEMPLATE_FILE = os.path.join(SCRIPT_DIR, "templates", "match.html.jinja")
+# match.html 화면 스크립트 (내용 해시 이름의 자산으로 복사)
+APP_JS = os.path.join(SCRIPT_DIR, "static", "match.js")
+# match.html 결과에 영향을 주는 코드/템플릿 (input_digest 에 포함)
+SOURCE_FILES = (
+    os.path.abspath(__file__), os.path.abspath(match_store.__file__), TEMPLATE_FILE, APP_JS, VIRTUAL_TABLE_JS,
+    os.path.abspath(assets.__file__), os.path.abspath(jinja_env.__file__),
+)
+# shard 형식 버전 (바뀌면 모든 shard 를 다시 쓰고 브라우저 캐시도 무효화)
+SHARD_VERSION = 2
+
+# 빈 문자열 / 시간을 나타내는 컬럼 값
+NO_VALUE = -1
+
+
+@dataclass
+class MatchColumns:
+    """날짜별 매칭 데이터의 컬럼형 표현
+
+    차량/구분/배송원/플릿은 strings 조회 테이블의 인덱스(없으면 NO_VALUE),
+    시작/종료 시간은 자정 기준 분으로 배열에 저장.
+    dates[i] 의 행은 offsets[i] <= row < offsets[i + 1] 구간.
+    """
+    strings: list = field(default_factory=list)
+    dates: list = field(default_factory=list)
+    offsets: array = field(default_factory=lambda: array('l', [0]))
+    vehicle: array = field(default_factory=lambda: array('l'))
+    type: array = field(default_factory=lambda: array('l'))
+    driver: array = field(default_factory=lambda: array('l'))
+    fleet: array = field(default_factory=lambda: array('l'))
+    start: array = field(default_factory=lambda: array('h'))
+    end: array = field(default_factory=lambda: array('h'))
+
+    def __len__(self):
+        return len(self.dates)
+
+
+def parse_data(store=None, batch_size=50000, work_dates=None):
+    """매칭 저장소를 읽어 MatchColumns 로 변환 (저장소 행은 날짜순, 빈 값은 이미 None)
+
+    batch_size 행씩 컬럼 단위로 받아 배열에 추가 (행마다 dict 를 만들지 않음)
+    work_dates 를 주면 해당 날짜만 읽음
+    """
+    data = MatchColumns()
+    # 문자열 -> 인덱스 (dict 삽입 순서 = strings 순서, None -> NO_VALUE)
+    index = {None: NO_VALUE}
+    encode = index.get
+
+    def register(column):
+        for value in dict.fromkeys(column):
+            if value not in index:
+                index[value] = len(index) - 1
+        return column
+
+    conn = store or match_store.connect()
+    cursor = match_store.iter_rows(conn, minutes=True, work_dates=work_dates)
+    current, count = None, 0
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        dates, vehicle, op_type, driver, start, end, fleet = zip(*batch)
+        data.vehicle.extend(map(encode, register(vehicle)))
+        data.type.extend(map(encode, register(op_type)))
+        data.driver.extend(map(encode, register(driver)))
+        data.fleet.extend(map(encode, register(fleet)))
+        data.start.extend(start)
+        data.end.extend(end)
+        # 날짜별 시작 위치 (행은 날짜순이므로 연속 구간)
+        for date, group in groupby(dates):
+            if date != current:
+                if current is not None:
+                    data.offsets.append(count)
+                data.dates.append(date)
+                current = date
+            count += sum(1 for _ in group)
+    if store is None:
+        conn.close()
+
+    if current is not None:
+        data.offsets.append(count)
+    data.strings = list(index)[1:]
+    return data
+
+
+def serialize_day(data, date_idx):
+    """MatchColumns 의 한 날짜 -> shard JSON 문자열 (화면 표시 순서와 요약까지 미리 계산)
+
+    {"date": "YYYY-MM-DD", "strings": [...], "vehicle": [...], "type": [...],
+    "driver": [...], "fleet": [...], "start": [...], "end": [...],
+    "groups": [...], "drivers": N}
+    행은 플릿 → 배송원 → 차량 순 정렬 후 배송원별로 묶은 순서이고, groups 는
+    배송원 그룹별 행 수(rowspan), drivers 는 배송원 수.
+    문자열 컬럼은 이 shard 의 strings 인덱스, 시간은 자정 기준 분, 빈 값은 NO_VALUE(-1).
+    """
+    lo, hi = data.offsets[date_idx], data.offsets[date_idx + 1]
+    text = lambda idx: data.strings[idx] if idx >= 0 else None
+
+    # 플릿 → 배송원 → 차량 순 정렬 (빈 값은 '')
+    order = sorted(range(lo, hi), key=lambda row: (
+        text(data.fleet[row]) or '', text(data.driver[row]) or '', text(data.vehicle[row]) or ''
+    ))
+    # 배송원별 그룹화 (그룹 순서 = 정렬 결과에서 처음 나온 순서, 배송원 없음은 한 그룹)
+    grouped = {}
+    for row in order:
+        grouped.setdefault(text(data.driver[row]) or '-', []).append(row)
+    order = [row for rows in grouped.values() for row in rows]
+
+    # 전체 문자열 인덱스 -> shard 내 인덱스 (shard 마다 필요한 문자열만 포함)
+    local = {}
+    shard = {"date": data.dates[date_idx], "strings": None}
+    for column in ("vehicle", "type", "driver", "fleet"):
+        values = getattr(data, column)
+        shard[column] = [
+            NO_VALUE if values[row] < 0 else local.setdefault(values[row], len(local))
+            for row in order
+        ]
+    shard["strings"] = [data.strings[idx] for idx in local]
+    shard["start"] = [data.start[row] for row in order]
+    shard["end"] = [data.end[row] for row in order]
+    shard["groups"] = [len(rows) for rows in grouped.values()]
+    shard["drivers"] = len([driver for driver in grouped if driver != '-'])
+    return json.dumps(shard, ensure_ascii=False, separators=(",", ":"))
+
+
+def input_digest():
+    """match.html / match_data/ 의 입력 해시 (저장소 day_meta 의 날짜별 해시 + 코드)"""
+    digest = hashlib.sha1()
+    for path in SOURCE_FILES:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    if match_store.STORE_PATH.exists():
+        # 읽기 전용 (connect() 는 스키마 생성/마이그레이션을 수행 - 병렬 생성 중 저장소에 쓰지 않도록)
+        store = sqlite3.connect(f"file:{match_store.STORE_PATH}?mode=ro", uri=True)
+        try:
+            for date, (row_count, content_hash, _) in match_store.day_meta(store).items():
+                digest.update(f"{date}|{row_count}|{content_hash}\n".encode("utf-8"))
+        except sqlite3.OperationalError:
+            # day_meta 도입 전 저장소 - 생성 단계의 connect() 가 마이그레이션한 뒤 해시가 바뀌어 한 번 더 생성됨
+            digest.update(b"no day_meta")
+        finally:
+            store.close()
+    return digest.hexdigest()
+
+
+def shard_name(date, shard_hash):
+    """shard 파일 이름 (내용 해시 포함 - 내용이 바뀌면 URL 도 바뀌므로 브라우저가 계속 캐시 가능)"""
+    return f"{date}.{shard_hash}.json"
+
+
+def write_shards(store):
+    """내용이 바뀐 날짜의 shard 만 다시 쓰고 index.json 갱신
+
+    저장소 day_meta 의 해시(+ SHARD_VERSION)와 기존 index.json 의 해시를 비교해
+    바뀐 날짜만 저장소에서 읽음. shard 는 <날짜>.<해시>.json 과 .gz/.br 사본으로 쓰고,
+    이전 해시의 shard 와 저장소에 없는 날짜의 shard 는 삭제.
+    index.json 의 dates 는 최신 날짜부터 정렬된 목록 (배열 위치 = 화면의 날짜 위치).
+    반환: 다시 쓴 shard 수
+    """
+    os.makedirs(MATCH_DATA_DIR, exist_ok=True)
+    meta = match_store.day_meta(store)
+    hashes = {date: f"v{SHARD_VERSION}.{content_hash}" for date, (_, content_hash, _) in meta.items()}
+
+    previous = {}
+    if os.path.exists(INDEX_FILE):
+        with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+            dates = json.load(f).get("dates")
+        if isinstance(dates, list):
+            previous = {entry["date"]: entry["hash"] for entry in dates}
+
+    changed = [
+        date for date in meta
+        if previous.get(date) != hashes[date]
+        or not os.path.exists(os.path.join(MATCH_DATA_DIR, shard_name(date, hashes[date])))
+    ]
+    if changed:
+        data = parse_data(store, work_dates=changed)
+        for date_idx, date in enumerate(data.dates):
+            path = os.path.join(MATCH_DATA_DIR, shard_name(date, hashes[date]))
+            assets.write_file(path, serialize_day(data, date_idx).encode("utf-8"))
+
+    # 현재 shard (+ 압축 사본) 와 index.json 외에는 모두 삭제 (이전 해시의 shard, 없어진 날짜)
+    keep = {"index.json"}
+    for date in meta:
+        name = shard_name(date, hashes[date])
+        keep.add(name)
+        keep.update(assets.compressed_names(name))
+    for name in os.listdir(MATCH_DATA_DIR):
+        if name not in keep:
+            os.remove(os.path.join(MATCH_DATA_DIR, name))
+
+    index = {"dates": [
+        {"date": date, "rows": meta[date][0], "hash": hashes[date]}
+        for date in sorted(meta, reverse=True)
+    ]}
+    jinja_env.write_if_changed(INDEX_FILE, json.dumps(index, ensure_ascii=False, separators=(",", ":")))
+    return len(changed)
+
+
+def generate_html():
+    """HTML 생성 (데이터는 포함하지 않고 match_data/ 의 index 와 shard 를 fetch)
+
+    스크립트와 날짜 목록(index.json 사본)은 내용 해시 이름의 자산(assets/match/)으로 쓰고,
+    match.html 은 이를 참조하는 작은 셸로 templates/match.html.jinja 에서 렌더링
+    """
     now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    html = f'''<!DOCTYPE html>
-<html lang="ko">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta http-equiv="Cache-Control" content="no-cache, no-store, must-revalidate">
-    <meta http-equiv="Pragma" content="no-cache">
-    <meta http-equiv="Expires" content="0">
-    <title>EVNSOLUTION 차량 매칭 현황</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            background: #f5f5f5;
-            padding: 20px;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-        }}
-        h1 {{
-            text-align: center;
-            color: #333;
-            margin-bottom: 10px;
-        }}
-        .summary {{
-            text-align: center;
-            color: #666;
-            margin-bottom: 30px;
-        }}
-        .header-row {{
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            flex-wrap: wrap;
-            gap: 20px;
-        }}
-        .date-selector {{
-            display: flex;
-            align-items: center;
-            gap: 12px;
-        }}
-        .date-selector select {{
-            padding: 10px 20px;
-            font-size: 16px;
-            font-weight: 600;
-            border: 2px solid #5B5BD6;
-            border-radius: 8px;
-            background: white;
-            color: #333;
-            cursor: pointer;
-            min-width: 160px;
-            margin-right: 8px;
-        }}
-        .nav-btn {{
-            width: 36px;
-            height: 36px;
-            border: 2px solid #5B5BD6;
-            background: white;
-            border-radius: 8px;
-            cursor: pointer;
-            font-size: 16px;
-            color: #5B5BD6;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-        }}
-        .nav-btn:disabled {{
-            opacity: 0.3;
-            cursor: not-allowed;
-        }}
-        .stats {{
-            display: flex;
-            justify-content: center;
-            gap: 15px;
-            margin-bottom: 30px;
-            flex-wrap: wrap;
-        }}
-        .stat-card {{
-            background: white;
-            padding: 20px 40px;
-            border-radius: 12px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-            text-align: center;
-        }}
-        .stat-card .number {{
-            font-size: 36px;
-            font-weight: bold;
-            color: #5B5BD6;
-        }}
-        .stat-card.match .number {{
-            color: #22c55e;
-        }}
-        .stat-card.nomatch .number {{
-            color: #ef4444;
-        }}
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            background: white;
-            border-radius: 12px;
-            overflow: hidden;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        }}
-        th, td {{
-            padding: 12px 16px;
-            text-align: left;
-            border-bottom: 1px solid #eee;
-        }}
-        th {{
-            background: #5B5BD6;
-            color: white;
-            font-weight: 600;
-        }}
-        tr:hover {{
-            background: #f9f9f9;
-        }}
-        .badge {{
-            display: inline-block;
-            padding: 4px 12px;
-            border-radius: 20px;
-            font-size: 12px;
-            font-weight: 600;
-        }}
-        .badge-match {{
-            background: #dcfce7;
-            color: #166534;
-        }}
-        .badge-nomatch {{
-            background: #fee2e2;
-            color: #991b1b;
-        }}
-        .badge-company {{
-            background: #dbeafe;
-            color: #1e40af;
-        }}
-        .badge-subscription {{
-            background: #f3e8ff;
-            color: #6b21a8;
-        }}
-        .badge-sales {{
-            background: #fef3c7;
-            color: #92400e;
-        }}
-        .badge-owner {{
-            background: #d1fae5;
-            color: #065f46;
-        }}
-        .badge-other {{
-            background: #f1f5f9;
-            color: #475569;
-        }}
-        .time-range {{
-            font-size: 13px;
-            color: #666;
-            font-family: monospace;
-        }}
-        .driver-cell {{
-            font-weight: 600;
-            background: #f8fafc;
-            vertical-align: middle;
-        }}
-        .group-first td {{
-            border-top: 2px solid #ddd;
-        }}
-        .update-time {{
-            text-align: center;
-            color: #999;
-            margin-top: 20px;
-            font-size: 14px;
-        }}
-    </style>
-</head>
-<body>
-<div class="container">
-    <h1>EVNSOLUTION 차량 매칭 현황</h1>
-    <p class="summary">배송원 기준 차량 매칭</p>
-
-    <div class="header-row">
-        <div class="date-selector">
-            <select id="dateSelect" onchange="selectDate(this.value)"></select>
-            <button class="nav-btn" id="prevBtn" onclick="prevDate()">&#9664;</button>
-            <button class="nav-btn" id="nextBtn" onclick="nextDate()">&#9654;</button>
-        </div>
-        <div class="stats" id="stats"></div>
-    </div>
-
-    <table>
-        <thead>
-            <tr>
-                <th>배송원</th>
-                <th>플릿</th>
-                <th>차량번호</th>
-                <th>운영구분</th>
-                <th>매칭시간</th>
-            </tr>
-        </thead>
-        <tbody id="tableBody"></tbody>
-    </table>
-
-    <p class="update-time">마지막 업데이트: {now_str}</p>
-</div>
-
-<script>
-const data = {js_data};
-const sortedDates = Object.keys(data).sort().reverse();
-let currentDate = sortedDates[0];
-
-function getTypeLabel(type) {{
-    const labels = {{
-        'COMPANY_OWNED': '직영',
-        'SUBSCRIPTION': '구독',
-        'SALES': '판매',
-        'OWNER_OPERATOR': '지입',
-        'OTHER': '기타'
-    }};
-    return labels[type] || type;
-}}
-
-function getTypeBadgeClass(type) {{
-    const classes = {{
-        'COMPANY_OWNED': 'badge-company',
-        'SUBSCRIPTION': 'badge-subscription',
-        'SALES': 'badge-sales',
-        'OWNER_OPERATOR': 'badge-owner',
-        'OTHER': 'badge-other'
-    }};
-    return classes[type] || 'badge-other';
-}}
-
-function formatDateLabel(dateStr) {{
-    const date = new Date(dateStr);
-    const days = ['일','월','화','수','목','금','토'];
-    return `${{date.getMonth()+1}}월 ${{date.getDate()}}일 (${{days[date.getDay()]}})`;
-}}
-
-function formatTimeRange(start, end) {{
-    if (!start && !end) return '-';
-    if (start && end) return `${{start}} - ${{end}}`;
-    if (start) return `${{start}} -`;
-    return `- ${{end}}`;
-}}
-
-function renderDateNav() {{
-    const select = document.getElementById('dateSelect');
-    select.innerHTML = sortedDates.map(d =>
-        `<option value="${{d}}" ${{d === currentDate ? 'selected' : ''}}>${{formatDateLabel(d)}}</option>`
-    ).join('');
-
-    const idx = sortedDates.indexOf(currentDate);
-    document.getElementById('prevBtn').disabled = idx >= sortedDates.length - 1;
-    document.getElementById('nextBtn').disabled = idx <= 0;
-}}
-
-function renderStats(date) {{
-    const items = data[date] || [];
-    const uniqueDrivers = [...new Set(items.filter(i => i.driver).map(i => i.driver))];
-    const driverCount = uniqueDrivers.length;
-    const matchCount = items.length;
-
-    document.getElementById('stats').innerHTML = `
-        <div class="stat-card match"><div class="number">${{driverCount}}</div><div class="label">매칭 인원</div></div>
-        <div class="stat-card"><div class="number">${{matchCount}}</div><div class="label">매칭 수</div></div>
-    `;
-}}
-
-function renderTable(date) {{
-    const items = data[date] || [];
-
-    // 플릿 → 배송원 → 차량 순으로 정렬
-    const sorted = [...items].sort((a,b) => {{
-        const fleetA = a.fleet || '';
-        const fleetB = b.fleet || '';
-        if (fleetA !== fleetB) return fleetA.localeCompare(fleetB, 'ko');
-        const driverA = a.driver || '';
-        const driverB = b.driver || '';
-        if (driverA !== driverB) return driverA.localeCompare(driverB, 'ko');
-        return a.vehicle.localeCompare(b.vehicle, 'ko');
-    }});
-
-    // 배송원별 그룹화
-    const grouped = {{}};
-    sorted.forEach(item => {{
-        const key = item.driver || '-';
-        if (!grouped[key]) grouped[key] = [];
-        grouped[key].push(item);
-    }});
-
-    let html = '';
-    let isFirst = true;
-    Object.keys(grouped).forEach(driver => {{
-        const driverItems = grouped[driver];
-        driverItems.forEach((item, idx) => {{
-            const rowClass = idx === 0 ? 'group-first' : '';
-            html += `<tr class="${{rowClass}}">`;
-            if (idx === 0) {{
-                html += `<td class="driver-cell" rowspan="${{driverItems.length}}">${{driver}}</td>`;
-            }}
-            html += `
-                <td>${{item.fleet || '-'}}</td>
-                <td>${{item.vehicle}}</td>
-                <td>${{item.type ? `<span class="badge ${{getTypeBadgeClass(item.type)}}">${{getTypeLabel(item.type)}}</span>` : '-'}}</td>
-                <td class="time-range">${{formatTimeRange(item.start, item.end)}}</td>
-            </tr>`;
-        }});
-        isFirst = false;
-    }});
-
-    document.getElementById('tableBody').innerHTML = html;
-}}
-
-function selectDate(date) {{
-    currentDate = date;
-    renderDateNav();
-    renderStats(date);
-    renderTable(date);
-}}
-
-function prevDate() {{
-    const i = sortedDates.indexOf(currentDate);
-    if (i < sortedDates.length - 1) selectDate(sortedDates[i + 1]);
-}}
-
-function nextDate() {{
-    const i = sortedDates.indexOf(currentDate);
-    if (i > 0) selectDate(sortedDates[i - 1]);
-}}
-
-renderDateNav();
-renderStats(currentDate);
-renderTable(currentDate);
-</script>
-</body>
-</html>'''
-
-    with open(HTML_FILE, 'w', encoding='utf-8') as f:
-        f.write(html)
-
-    print(f"HTML 생성 완료: {HTML_FILE}")
+    with open(VIRTUAL_TABLE_JS, 'r', encoding='utf-8') as f:
+        virtual_table_js = f.read()
+    with open(APP_JS, 'r', encoding='utf-8') as f:
+        app_js = f.read()
+    with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+        index_json = f.read()
+
+    urls = assets.write_assets("match", {
+        "virtual_table": (virtual_table_js, "js"),
+        "app": (app_js, "js"),
+        "index": (index_json, "json"),
+    })
+    if jinja_env.render_to_file(MATCH_TEMPLATE, HTML_FILE, updated_at=now_str, assets=urls):
+        print(f"HTML 생성 완료: {HTML_FILE}")
+    else:
+        print(f"HTML 변경 없음: {HTML_FILE}")
 
 
 def main():
-    if not os.path.exists(DATA_FILE):
-        print(f"데이터 파일이 없습니다: {DATA_FILE}")
+    if not match_store.STORE_PATH.exists() and not match_store.LEGACY_DATA_FILE.exists():
+        print(f"데이터 저장소가 없습니다: {match_store.STORE_PATH}")
         return
 
-    data = parse_data()
-    if not data:
+    store = match_store.connect()
+    if not match_store.day_meta(store):
         print("파싱된 데이터가 없습니다")
+        store.close()
         return
 
-    generate_html(data)
+    written = write_shards(store)
+    store.close()
+    print(f"shard 갱신: {written}개 날짜 ({MATCH_DATA_DIR})")
+
+    generate_html()
 
 
 if __name__ == '__main__':
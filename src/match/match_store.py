@@ -0,0 +1,251 @@
+"""Date-partitioned SQLite store for vehicle-driver match data.
+
+Replaces the flat data.txt file: every row carries its work_date and the
+table is indexed on it, so replacing or dropping a day only touches that
+day's rows. day_meta keeps a row count and content hash per day, so readers
+can tell which days changed without reading them.
+"""
+import hashlib
+import json
+import sqlite3
+import sys
+from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+STORE_PATH = SCRIPT_DIR / "match.sqlite"
+LEGACY_DATA_FILE = SCRIPT_DIR / "data.txt"
+
+def _init(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS matches (
+            work_date TEXT NOT NULL,
+            vehicle TEXT,
+            op_type TEXT,
+            driver TEXT,
+            start_time TEXT,
+            end_time TEXT,
+            fleet TEXT
+        )
+    """)
+    # 같은 날짜 안에서는 rowid(삽입 순서 = 조회 정렬 순서)로 정렬됨
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_work_date ON matches(work_date)")
+    # 증분 동기화 상태 (query_matches.sync 의 워터마크 등), kind: 값을 해석할 타입
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_state (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            kind TEXT
+        )
+    """)
+    # Migration: kind 컬럼 (기존 행은 NULL - 다음 sync 에서 컬럼 타입으로 결정)
+    try:
+        conn.execute("ALTER TABLE sync_state ADD COLUMN kind TEXT")
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+    # 날짜별 행 수 / 내용 해시 (내용이 바뀐 날짜만 updated_at 갱신)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS day_meta (
+            work_date TEXT PRIMARY KEY,
+            row_count INTEGER,
+            content_hash TEXT,
+            updated_at TEXT
+        )
+    """)
+    # Migration: day_meta 도입 전 저장소는 한 번 전체 계산
+    if not conn.execute("SELECT 1 FROM day_meta LIMIT 1").fetchone():
+        with conn:
+            _refresh_day_meta(conn, "1 = 1", ())
+
+
+def _refresh_day_meta(conn: sqlite3.Connection, where: str, params):
+    """Recompute day_meta for the work_dates matching `where` (a work_date condition)."""
+    now = datetime.now().isoformat(timespec="seconds")
+    meta = []
+    cursor = conn.execute(f"""
+        SELECT work_date, vehicle, op_type, driver, start_time, end_time, fleet
+        FROM matches WHERE {where}
+        ORDER BY work_date, rowid
+    """, params)
+    for work_date, rows in groupby(cursor, key=itemgetter(0)):
+        digest = hashlib.sha1()
+        count = 0
+        for row in rows:
+            digest.update(json.dumps(row[1:], ensure_ascii=False).encode("utf-8"))
+            count += 1
+        meta.append((work_date, count, digest.hexdigest()[:16], now))
+
+    conn.execute(f"""
+        DELETE FROM day_meta
+        WHERE {where} AND work_date NOT IN (SELECT work_date FROM matches WHERE {where})
+    """, tuple(params) * 2)
+    conn.executemany("""
+        INSERT INTO day_meta(work_date, row_count, content_hash, updated_at) VALUES (?, ?, ?, ?)
+        ON CONFLICT(work_date) DO UPDATE SET
+            row_count = excluded.row_count,
+            content_hash = excluded.content_hash,
+            updated_at = CASE WHEN day_meta.content_hash = excluded.content_hash
+                              THEN day_meta.updated_at ELSE excluded.updated_at END
+    """, meta)
+
+
+def _normalize(row):
+    """Empty optional fields are stored as NULL, like parse_data's None normalisation."""
+    vehicle, *rest = row
+    return (vehicle,) + tuple(v if v else None for v in rest)
+
+
+def connect(path=None) -> sqlite3.Connection:
+    """Open the store, creating it (and migrating data.txt once) if missing."""
+    path = Path(path or STORE_PATH)
+    fresh = not path.exists()
+    conn = sqlite3.connect(path)
+    _init(conn)
+    if fresh and path == STORE_PATH and LEGACY_DATA_FILE.exists():
+        count = migrate_from_text(conn, LEGACY_DATA_FILE)
+        print(f"Migrated {count} records from {LEGACY_DATA_FILE.name}")
+    return conn
+
+
+def replace_day(conn: sqlite3.Connection, work_date: str, rows):
+    """Replace all rows of one work_date; rows are (vehicle, op_type, driver, start, end, fleet)."""
+    with conn:
+        conn.execute("DELETE FROM matches WHERE work_date = ?", (work_date,))
+        conn.executemany(
+            "INSERT INTO matches(work_date, vehicle, op_type, driver, start_time, end_time, fleet) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((work_date,) + _normalize(row) for row in rows)
+        )
+        _refresh_day_meta(conn, "work_date = ?", (work_date,))
+
+
+def _insert_batches(conn: sqlite3.Connection, batches) -> int:
+    count = 0
+    for batch in batches:
+        conn.executemany(
+            "INSERT INTO matches(work_date, vehicle, op_type, driver, start_time, end_time, fleet) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(work_date,) + _normalize(row) for work_date, *row in batch]
+        )
+        count += len(batch)
+    return count
+
+
+def replace_range(conn: sqlite3.Connection, start_date: str, end_date: str, batches) -> int:
+    """Replace every work_date in start_date..end_date (inclusive) in one transaction.
+
+    batches is an iterable of row lists, each row being (work_date, vehicle,
+    op_type, driver, start, end, fleet); it is consumed one batch at a time,
+    so memory use is bounded by the batch size. Dates in the range without
+    rows end up empty. Returns the number of rows written.
+    """
+    with conn:
+        conn.execute("DELETE FROM matches WHERE work_date BETWEEN ? AND ?", (start_date, end_date))
+        count = _insert_batches(conn, batches)
+        _refresh_day_meta(conn, "work_date BETWEEN ? AND ?", (start_date, end_date))
+    return count
+
+
+def replace_days(conn: sqlite3.Connection, work_dates, batches) -> int:
+    """Replace the given (not necessarily contiguous) work_dates in one transaction.
+
+    Same batch format as replace_range; returns the number of rows written.
+    """
+    with conn:
+        conn.executemany("DELETE FROM matches WHERE work_date = ?", [(d,) for d in work_dates])
+        count = _insert_batches(conn, batches)
+        _refresh_day_meta(conn, "work_date IN (SELECT value FROM json_each(?))", (json.dumps(list(work_dates)),))
+    return count
+
+
+def drop_day(conn: sqlite3.Connection, work_date: str):
+    """Remove one work_date."""
+    with conn:
+        conn.execute("DELETE FROM matches WHERE work_date = ?", (work_date,))
+        _refresh_day_meta(conn, "work_date = ?", (work_date,))
+
+
+def day_meta(conn: sqlite3.Connection) -> dict:
+    """Return {work_date: (row_count, content_hash, updated_at)} for every stored day."""
+    cursor = conn.execute("SELECT work_date, row_count, content_hash, updated_at FROM day_meta ORDER BY work_date")
+    return {work_date: meta for work_date, *meta in cursor}
+
+
+def get_state_with_kind(conn: sqlite3.Connection, key: str):
+    """Return (value, kind) of a sync_state entry; (None, None) if unset."""
+    row = conn.execute("SELECT value, kind FROM sync_state WHERE key = ?", (key,)).fetchone()
+    return row if row else (None, None)
+
+
+def set_state(conn: sqlite3.Connection, key: str, value: str, kind: str = None):
+    """Set a sync_state value, with the kind it is to be parsed as."""
+    with conn:
+        conn.execute(
+            "INSERT INTO sync_state(key, value, kind) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, kind = excluded.kind",
+            (key, value, kind)
+        )
+
+
+def iter_rows(conn: sqlite3.Connection, minutes=False, work_dates=None):
+    """Yield (work_date, vehicle, op_type, driver, start, end, fleet) ordered by date, then insertion.
+
+    With minutes=True, start / end are minutes since midnight (-1 when empty)
+    instead of 'HH:MM' text. With work_dates, only those dates are read.
+    """
+    if minutes:
+        start, end = (
+            f"COALESCE(CAST(substr({column}, 1, 2) AS INTEGER) * 60 + CAST(substr({column}, 4, 2) AS INTEGER), -1)"
+            for column in ("start_time", "end_time")
+        )
+    else:
+        start, end = "start_time", "end_time"
+    where, params = ("", ())
+    if work_dates is not None:
+        where, params = "WHERE work_date IN (SELECT value FROM json_each(?))", (json.dumps(list(work_dates)),)
+    return conn.execute(f"""
+        SELECT work_date, vehicle, op_type, driver, {start}, {end}, fleet
+        FROM matches {where}
+        ORDER BY work_date, rowid
+    """, params)
+
+
+def migrate_from_text(conn: sqlite3.Connection, data_file) -> int:
+    """Import a pipe-delimited data.txt (date|vehicle|type|driver|start|end|fleet).
+
+    The old writer formatted a missing operation_type as the string 'None';
+    it is imported as NULL.
+    """
+    days = {}
+    with open(data_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+
+            parts = line.split('|')
+            if len(parts) < 5:
+                continue
+
+            date, vehicle, op_type, driver = parts[:4]
+            start_time = parts[4] if len(parts) > 4 else ''
+            end_time = parts[5] if len(parts) > 5 else ''
+            fleet = parts[6] if len(parts) > 6 else ''
+            op_type = '' if op_type == 'None' else op_type
+            days.setdefault(date, []).append((vehicle, op_type, driver, start_time, end_time, fleet))
+
+    for work_date, rows in days.items():
+        replace_day(conn, work_date, rows)
+    return sum(len(rows) for rows in days.values())
+
+
+if __name__ == "__main__":
+    # 사용법: python match_store.py migrate [data.txt]
+    if len(sys.argv) < 2 or sys.argv[1] != "migrate":
+        print("Usage: python match_store.py migrate [data.txt]")
+        sys.exit(1)
+    source = Path(sys.argv[2]) if len(sys.argv) > 2 else LEGACY_DATA_FILE
+    conn = sqlite3.connect(STORE_PATH)
+    _init(conn)
+    print(f"Migrated {migrate_from_text(conn, source)} records from {source}")
+    conn.close()
@@ -7,14 +7,25 @@ import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 import psycopg2
+from psycopg2 import sql
 from dotenv import load_dotenv
 
+import match_store
+
 SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_DIR = SCRIPT_DIR.parent.parent
 load_dotenv(dotenv_path=PROJECT_DIR / ".env")
+sys.path.insert(0, str(SCRIPT_DIR.parent / "common"))
+
+import pipeline_metrics
 
-DATA_FILE = SCRIPT_DIR / "data.txt"
 START_DATE = "2026-01-20"
+# 서버 측 커서에서 한 번에 가져와 저장소에 쓰는 행 수 (메모리 사용량 상한)
+MATCH_FETCH_SIZE = int(os.getenv("MATCH_FETCH_SIZE", "5000"))
+# sync 모드 워터마크 컬럼 (schedule_drivervehiclematch 의 수정 시각 또는 증가하는 id)
+MATCH_WATERMARK_COLUMN = os.getenv("MATCH_WATERMARK_COLUMN", "updated_at")
+# 시각 워터마크를 이만큼 앞당겨 조회 (늦게 커밋된 트랜잭션 대비)
+MATCH_SYNC_OVERLAP_MINUTES = int(os.getenv("MATCH_SYNC_OVERLAP_MINUTES", "10"))
 
 
 def get_db_config():
@@ -28,102 +39,240 @@ def get_db_config():
     }
 
 
-def query_matches(work_date: str) -> list:
-    """
-    Query vehicle-driver matches for a specific work date.
+_MATCH_SELECT = """
+    SELECT
+        dvm.work_date::text as date,
+        t.plate_number as vehicle_number,
+        t.operation_type,
+        COALESCE(d.name, '') as driver_name,
+        TO_CHAR(dvm.match_start_time AT TIME ZONE 'Asia/Seoul', 'HH24:MI') as start_time,
+        TO_CHAR(dvm.match_end_time AT TIME ZONE 'Asia/Seoul', 'HH24:MI') as end_time,
+        f.name as fleet_name
+    FROM schedule_drivervehiclematch dvm
+    JOIN dashboard_terminal t ON dvm.vehicle_id = t.id
+    LEFT JOIN core_fleet f ON t.fleet_id = f.id
+    LEFT JOIN core_user u ON dvm.user_id = u.id
+    LEFT JOIN documents_document d ON u.delivery_user_id = d.id
+"""
 
-    Returns: date, vehicle_number, operation_type, driver_name, start_time, end_time, fleet_name
-    """
+MATCH_QUERY = _MATCH_SELECT + """
+    WHERE dvm.work_date BETWEEN %(start_date)s::date AND %(end_date)s::date
+    ORDER BY dvm.work_date, dvm.match_start_time ASC, t.plate_number;
+"""
+
+MATCH_DAYS_QUERY = _MATCH_SELECT + """
+    WHERE dvm.work_date = ANY(%(work_dates)s::date[])
+    ORDER BY dvm.work_date, dvm.match_start_time ASC, t.plate_number;
+"""
+
+WATERMARK_QUERY = sql.SQL("SELECT MAX({column}) FROM schedule_drivervehiclematch")
+
+WATERMARK_COLUMN_QUERY = """
+    SELECT data_type
+    FROM information_schema.columns
+    WHERE table_name = 'schedule_drivervehiclematch' AND column_name = %(column)s
+    ORDER BY table_schema = current_schema() DESC
+    LIMIT 1
+"""
+
+# 워터마크 종류 (sync_state 에 값과 함께 저장, 값은 이 종류로만 해석)
+WATERMARK_KINDS = {
+    "timestamp": ("timestamp with time zone", "timestamp without time zone", "date"),
+    "integer": ("smallint", "integer", "bigint", "numeric"),
+}
+
+CHANGED_DAYS_QUERY = sql.SQL("""
+    SELECT DISTINCT work_date::text
+    FROM schedule_drivervehiclematch
+    WHERE {column} > %(since)s AND work_date <= %(until)s::date
+    ORDER BY 1
+""")
+
+
+def _stream(query, params, batch_size=None):
+    """Run query on a server-side (named) cursor and yield lists of at most batch_size rows."""
+    batch_size = batch_size or MATCH_FETCH_SIZE
     config = get_db_config()
     conn = psycopg2.connect(**config)
-    cursor = conn.cursor()
-
-    query = """
-        SELECT
-            %(work_date)s as date,
-            t.plate_number as vehicle_number,
-            t.operation_type,
-            COALESCE(d.name, '') as driver_name,
-            TO_CHAR(dvm.match_start_time AT TIME ZONE 'Asia/Seoul', 'HH24:MI') as start_time,
-            TO_CHAR(dvm.match_end_time AT TIME ZONE 'Asia/Seoul', 'HH24:MI') as end_time,
-            f.name as fleet_name
-        FROM schedule_drivervehiclematch dvm
-        JOIN dashboard_terminal t ON dvm.vehicle_id = t.id
-        LEFT JOIN core_fleet f ON t.fleet_id = f.id
-        LEFT JOIN core_user u ON dvm.user_id = u.id
-        LEFT JOIN documents_document d ON u.delivery_user_id = d.id
-        WHERE dvm.work_date = %(work_date)s::date
-        ORDER BY dvm.match_start_time ASC, t.plate_number;
+    try:
+        cursor = conn.cursor(name="match_stream")
+        cursor.execute(query, params)  # DECLARE
+        pipeline_metrics.add(round_trips=1)
+        while True:
+            # 서버 측 커서의 fetchmany 는 매번 FETCH 왕복 (마지막 빈 결과 포함)
+            batch = cursor.fetchmany(batch_size)
+            pipeline_metrics.add(round_trips=1, rows=len(batch))
+            if not batch:
+                break
+            yield batch
+        cursor.close()
+    finally:
+        conn.close()
+
+
+def query_range(start_date: str, end_date: str, batch_size: int = None):
     """
+    Stream vehicle-driver matches for start_date..end_date (inclusive).
 
-    cursor.execute(query, {
-        "work_date": work_date
-    })
+    Uses one connection and one server-side (named) cursor and yields lists
+    of at most batch_size rows (default MATCH_FETCH_SIZE), so at most one
+    batch is held in memory. Rows are ordered by work_date:
+    date, vehicle_number, operation_type, driver_name, start_time, end_time, fleet_name
+    """
+    return _stream(MATCH_QUERY, {
+        "start_date": start_date,
+        "end_date": end_date
+    }, batch_size)
+
+
+def query_days(work_dates: list, batch_size: int = None):
+    """Stream vehicle-driver matches for the given work dates, batched like query_range."""
+    return _stream(MATCH_DAYS_QUERY, {
+        "work_dates": list(work_dates)
+    }, batch_size)
 
-    results = cursor.fetchall()
-    cursor.close()
-    conn.close()
 
-    return results
+def append_range(start_date: str, end_date: str, store=None) -> int:
+    """Query and store start_date..end_date in one write (replaces every date in the range)."""
+    conn = store or match_store.connect()
+    count = match_store.replace_range(conn, start_date, end_date, query_range(start_date, end_date))
+    if store is None:
+        conn.close()
+    return count
 
 
-def append_data(work_date: str):
-    """Query and append data for specific date."""
-    remove_date(work_date)
-    results = query_matches(work_date)
+def append_data(work_date: str, store=None):
+    """Query and store data for specific date (replaces that date in the store)."""
+    count = append_range(work_date, work_date, store)
+    print(f"Added {count} records for {work_date}")
 
-    with open(DATA_FILE, "a", encoding="utf-8") as f:
-        for date, vehicle, op_type, driver, start_time, end_time, fleet_name in results:
-            start = start_time or ''
-            end = end_time or ''
-            fleet = fleet_name or ''
-            f.write(f"{date}|{vehicle}|{op_type}|{driver}|{start}|{end}|{fleet}\n")
 
-    print(f"Added {len(results)} records for {work_date}")
+def _watermark_kind(data_type):
+    """information_schema data_type of the watermark column -> 'timestamp' or 'integer'."""
+    for kind, data_types in WATERMARK_KINDS.items():
+        if data_type in data_types:
+            return kind
+    raise ValueError(f"Unsupported watermark column type: {MATCH_WATERMARK_COLUMN} ({data_type})")
+
+
+def _parse_watermark(value, kind):
+    """Stored watermark text -> datetime ('timestamp') or int ('integer')."""
+    if value is None:
+        return None
+    if kind == "timestamp":
+        return datetime.fromisoformat(value)
+    if kind == "integer":
+        return int(value)
+    raise ValueError(f"Unknown watermark kind: {kind}")
+
+
+def sync():
+    """
+    Re-pull only the work dates whose matches changed since the last sync.
+
+    The watermark is MAX(MATCH_WATERMARK_COLUMN) seen at the previous run,
+    kept in the store with its kind (timestamp or integer, taken from the
+    column type). Changed dates up to yesterday are replaced, and
+    yesterday is always replaced as well (so matches changed on the day
+    itself are not missed once the watermark passes them). Deleted rows
+    leave no watermark trace; they are picked up for yesterday, or by a
+    range refresh. The first run (no watermark) loads START_DATE..yesterday.
+
+    Until the column is confirmed to exist (no kind stored yet), it is
+    looked up first; if it is missing, only yesterday is replaced, like
+    `today`, so a misconfigured column never breaks the scheduled run.
+    """
+    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    column = sql.Identifier(MATCH_WATERMARK_COLUMN)
+
+    store = match_store.connect()
+    value, kind = match_store.get_state_with_kind(store, "watermark")
+
+    # 변경 날짜 조회 전에 워터마크를 먼저 읽음 (조회 중 변경분은 다음 실행에서 다시 포함)
+    conn = psycopg2.connect(**get_db_config())
+    try:
+        cursor = conn.cursor()
+        round_trips = 0
+        if kind is None:
+            # 컬럼 존재 / 타입 확인 (처음 실행, 또는 kind 도입 전에 저장된 워터마크)
+            cursor.execute(WATERMARK_COLUMN_QUERY, {"column": MATCH_WATERMARK_COLUMN})
+            round_trips += 1
+            row = cursor.fetchone()
+            if row is None:
+                cursor.close()
+                pipeline_metrics.add(round_trips=round_trips)
+                print(f"Warning: schedule_drivervehiclematch has no column {MATCH_WATERMARK_COLUMN!r} "
+                      f"(MATCH_WATERMARK_COLUMN); replacing yesterday only.")
+                store.close()
+                append_data(yesterday)
+                return
+            kind = _watermark_kind(row[0])
+
+        since = _parse_watermark(value, kind)
+        if kind == "timestamp" and since is not None:
+            since -= timedelta(minutes=MATCH_SYNC_OVERLAP_MINUTES)
+
+        cursor.execute(WATERMARK_QUERY.format(column=column))
+        watermark = cursor.fetchone()[0]
+        changed = []
+        if since is not None:
+            cursor.execute(CHANGED_DAYS_QUERY.format(column=column), {"since": since, "until": yesterday})
+            changed = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        pipeline_metrics.add(round_trips=round_trips + (1 if since is None else 2))
+    finally:
+        conn.close()
+
+    if since is None:
+        count = append_range(START_DATE, yesterday, store)
+        print(f"Bootstrapped {count} records for {START_DATE}..{yesterday}")
+    else:
+        work_dates = sorted(set(changed) | {yesterday})
+        count = match_store.replace_days(store, work_dates, query_days(work_dates))
+        print(f"Synced {count} records for {len(work_dates)} day(s): {', '.join(work_dates)}")
+
+    if watermark is not None:
+        value = watermark.isoformat() if kind == "timestamp" else str(int(watermark))
+        match_store.set_state(store, "watermark", value, kind)
+    store.close()
 
 
 def remove_date(work_date: str):
     """Remove existing data for specific date."""
-    if not DATA_FILE.exists():
-        return
-
-    lines = DATA_FILE.read_text(encoding="utf-8").splitlines()
-    new_lines = [l for l in lines if not l.startswith(f"{work_date}|")]
-    DATA_FILE.write_text("\n".join(new_lines) + ("\n" if new_lines else ""), encoding="utf-8")
+    conn = match_store.connect()
+    match_store.drop_day(conn, work_date)
+    conn.close()
 
 
 def refresh_all():
     """Refresh all data from START_DATE to yesterday."""
-    start_dt = datetime.strptime(START_DATE, "%Y-%m-%d")
-    yesterday = datetime.now() - timedelta(days=1)
-
-    DATA_FILE.write_text("")
-
-    current = start_dt
-    while current <= yesterday:
-        date_str = current.strftime("%Y-%m-%d")
-        try:
-            append_data(date_str)
-        except Exception as e:
-            print(f"Failed to query {date_str}: {e}")
-        current += timedelta(days=1)
+    yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    count = append_range(START_DATE, yesterday)
+    print(f"Added {count} records for {START_DATE}..{yesterday}")
 
 
 def main():
     """Main entry point."""
     if len(sys.argv) < 2:
-        print("Usage: python query_matches.py [today|all|YYYY-MM-DD]")
+        print("Usage: python query_matches.py [sync|today|all|YYYY-MM-DD|YYYY-MM-DD..YYYY-MM-DD]")
         sys.exit(1)
 
     cmd = sys.argv[1]
 
-    if cmd == "today":
-        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-        append_data(yesterday)
-    elif cmd == "all":
-        refresh_all()
-    else:
-        append_data(cmd)
+    with pipeline_metrics.stage("query"):
+        if cmd == "sync":
+            sync()
+        elif cmd == "today":
+            yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+            append_data(yesterday)
+        elif cmd == "all":
+            refresh_all()
+        elif ".." in cmd:
+            start_date, end_date = cmd.split("..", 1)
+            count = append_range(start_date, end_date)
+            print(f"Added {count} records for {start_date}..{end_date}")
+        else:
+            append_data(cmd)
 
 
 if __name__ == "__main__":
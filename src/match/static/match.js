@@ -0,0 +1,190 @@
+// match.html 화면 스크립트 (generate_html.py 가 내용 해시 이름의 자산으로 복사)
+// MATCH_INDEX_URL: 날짜 목록 자산 (assets/match/index.*.json) 경로 - match.html 에서 정의
+// index.json: 최신 날짜부터 정렬된 목록 (배열 위치 = 날짜 위치)
+let dateIndex = [];
+let datePosition = new Map();  // 날짜 -> dateIndex 위치
+let currentDate = null;
+
+// shard 컬럼 배열 -> 행 객체 (행 순서, 그룹, 인원 수는 생성 시 계산됨)
+function decodeShard(shard) {
+    const text = idx => idx < 0 ? null : shard.strings[idx];
+    const time = m => m < 0 ? null : String(Math.floor(m / 60)).padStart(2, '0') + ':' + String(m % 60).padStart(2, '0');
+    const items = shard.vehicle.map((vehicle, i) => ({
+        vehicle: text(vehicle),
+        type: text(shard.type[i]),
+        driver: text(shard.driver[i]),
+        start: time(shard.start[i]),
+        end: time(shard.end[i]),
+        fleet: text(shard.fleet[i])
+    }));
+    // 행 -> 배송원 그룹 [시작, 끝) (가상 스크롤에서 잘린 그룹의 rowspan 계산용)
+    const groupStart = new Int32Array(items.length);
+    const groupEnd = new Int32Array(items.length);
+    let row = 0;
+    shard.groups.forEach(size => {
+        for (let i = 0; i < size; i++) {
+            groupStart[row + i] = row;
+            groupEnd[row + i] = row + size;
+        }
+        row += size;
+    });
+    return { items, groupStart, groupEnd, drivers: shard.drivers };
+}
+
+// 날짜별 shard fetch (파일 이름에 내용 해시 포함, 한 번 받은 날짜는 재사용)
+const shardCache = new Map();
+function loadShard(date) {
+    if (!shardCache.has(date)) {
+        const promise = fetch(`match_data/${date}.${dateIndex[datePosition.get(date)].hash}.json`)
+            .then(res => {
+                if (!res.ok) throw new Error(`HTTP ${res.status}`);
+                return res.json();
+            })
+            .then(decodeShard)
+            .catch(err => {
+                shardCache.delete(date);
+                throw err;
+            });
+        shardCache.set(date, promise);
+    }
+    return shardCache.get(date);
+}
+
+function prefetchNeighbours(date) {
+    const i = datePosition.get(date);
+    [i - 1, i + 1].forEach(j => {
+        if (j >= 0 && j < dateIndex.length) loadShard(dateIndex[j].date).catch(() => {});
+    });
+}
+
+function getTypeLabel(type) {
+    const labels = {
+        'COMPANY_OWNED': '직영',
+        'SUBSCRIPTION': '구독',
+        'SALES': '판매',
+        'OWNER_OPERATOR': '지입',
+        'OTHER': '기타'
+    };
+    return labels[type] || type;
+}
+
+function getTypeBadgeClass(type) {
+    const classes = {
+        'COMPANY_OWNED': 'badge-company',
+        'SUBSCRIPTION': 'badge-subscription',
+        'SALES': 'badge-sales',
+        'OWNER_OPERATOR': 'badge-owner',
+        'OTHER': 'badge-other'
+    };
+    return classes[type] || 'badge-other';
+}
+
+function formatDateLabel(dateStr) {
+    const date = new Date(dateStr);
+    const days = ['일','월','화','수','목','금','토'];
+    return `${date.getMonth()+1}월 ${date.getDate()}일 (${days[date.getDay()]})`;
+}
+
+function formatTimeRange(start, end) {
+    if (!start && !end) return '-';
+    if (start && end) return `${start} - ${end}`;
+    if (start) return `${start} -`;
+    return `- ${end}`;
+}
+
+function buildDateOptions() {
+    document.getElementById('dateSelect').innerHTML = dateIndex.map(({ date }) =>
+        `<option value="${date}">${formatDateLabel(date)}</option>`
+    ).join('');
+}
+
+function renderDateNav() {
+    document.getElementById('dateSelect').value = currentDate;
+
+    const idx = datePosition.get(currentDate);
+    document.getElementById('prevBtn').disabled = idx >= dateIndex.length - 1;
+    document.getElementById('nextBtn').disabled = idx <= 0;
+}
+
+function renderStats(shard) {
+    const driverCount = shard.drivers;
+    const matchCount = shard.items.length;
+
+    document.getElementById('stats').innerHTML = `
+        <div class="stat-card match"><div class="number">${driverCount}</div><div class="label">매칭 인원</div></div>
+        <div class="stat-card"><div class="number">${matchCount}</div><div class="label">매칭 수</div></div>
+    `;
+}
+
+// 행은 이미 플릿 → 배송원 → 차량 순 정렬 + 배송원별로 묶인 순서
+// 보이는 구간만 렌더링하고, 구간 첫 행이 그룹 중간이면 그 행에 배송원 셀을 다시 표시
+let currentShard = null;
+const esc = VirtualTable.escape;
+
+function renderRow(row, pos, start, end) {
+    const shard = currentShard;
+    const item = shard.items[row];
+    const groupFirst = shard.groupStart[row] === row;
+    let html = `<tr class="${groupFirst ? 'group-first' : ''}">`;
+    if (groupFirst || pos === start) {
+        const span = Math.min(shard.groupEnd[row], end) - row;
+        html += `<td class="driver-cell" rowspan="${span}">${esc(item.driver || '-')}</td>`;
+    }
+    html += `
+        <td>${esc(item.fleet || '-')}</td>
+        <td>${esc(item.vehicle)}</td>
+        <td>${item.type ? `<span class="badge ${getTypeBadgeClass(item.type)}">${esc(getTypeLabel(item.type))}</span>` : '-'}</td>
+        <td class="time-range">${formatTimeRange(item.start, item.end)}</td>
+    </tr>`;
+    return html;
+}
+
+const matchTable = new VirtualTable({
+    scroller: document.getElementById('tableScroll'),
+    body: document.getElementById('tableBody'),
+    columns: 5,
+    renderRow: renderRow
+});
+
+function renderTable(shard) {
+    currentShard = shard;
+    matchTable.setRows(shard.items.length);
+}
+
+async function selectDate(date) {
+    currentDate = date;
+    renderDateNav();
+    let shard;
+    try {
+        shard = await loadShard(date);
+    } catch (err) {
+        if (date === currentDate) {
+            matchTable.setRows(0);
+            document.getElementById('tableBody').innerHTML = `<tr><td colspan="5">데이터를 불러오지 못했습니다 (${err.message})</td></tr>`;
+        }
+        return;
+    }
+    if (date !== currentDate) return;  // 로딩 중 다른 날짜 선택됨
+    renderStats(shard);
+    renderTable(shard);
+    prefetchNeighbours(date);
+}
+
+function prevDate() {
+    const i = datePosition.get(currentDate);
+    if (i < dateIndex.length - 1) selectDate(dateIndex[i + 1].date);
+}
+
+function nextDate() {
+    const i = datePosition.get(currentDate);
+    if (i > 0) selectDate(dateIndex[i - 1].date);
+}
+
+fetch(MATCH_INDEX_URL)
+    .then(res => res.json())
+    .then(index => {
+        dateIndex = index.dates;
+        datePosition = new Map(dateIndex.map((entry, i) => [entry.date, i]));
+        buildDateOptions();
+        selectDate(dateIndex[0].date);
+    });
@@ -0,0 +1,92 @@
+"""Match export memory bound: peak memory must not grow with the result size.
+
+psycopg2.connect in query_matches is replaced by a fake connection whose
+named cursor generates synthetic match rows on demand, and append_range
+streams them into a temp store under tracemalloc.
+"""
+
+import sys
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / 'src' / 'match'))
+
+import match_store
+import query_matches
+
+ROWS_PER_DAY = 2000
+BATCH_SIZE = 2000
+# 가장 큰 결과의 최고 메모리 / 가장 작은 결과의 최고 메모리 허용 비율
+PEAK_TOLERANCE = 1.5
+
+
+class FakeCursor:
+    """Named-cursor stand-in that yields synthetic rows through fetchmany."""
+
+    def __init__(self, n_rows):
+        self.n_rows = n_rows
+        self.position = 0
+
+    def execute(self, query, params):
+        self.start = date.fromisoformat(params["start_date"])
+
+    def fetchmany(self, size):
+        end = min(self.position + size, self.n_rows)
+        batch = []
+        for i in range(self.position, end):
+            day = (self.start + timedelta(days=i // ROWS_PER_DAY)).isoformat()
+            minute = i % 1440
+            batch.append((
+                day, f"{i % 900:03d}가{i % 10000:04d}", "daily", f"driver_{i % 5000}",
+                f"{minute // 60:02d}:{minute % 60:02d}", None, f"fleet_{i % 40}",
+            ))
+        self.position = end
+        return batch
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, n_rows):
+        self.n_rows = n_rows
+
+    def cursor(self, name=None):
+        assert name, "export must use a named (server-side) cursor"
+        return FakeCursor(self.n_rows)
+
+    def close(self):
+        pass
+
+
+def export_peak(monkeypatch, tmp_path, n_rows):
+    """tracemalloc peak (bytes) of one append_range over n_rows synthetic rows."""
+    monkeypatch.setattr(query_matches.psycopg2, "connect", lambda **config: FakeConnection(n_rows))
+    monkeypatch.setattr(query_matches, "MATCH_FETCH_SIZE", BATCH_SIZE)
+    start = date(2026, 1, 1)
+    end = start + timedelta(days=-(-n_rows // ROWS_PER_DAY) - 1)
+
+    store = match_store.connect(tmp_path / f"match_{n_rows}.sqlite")
+    tracemalloc.start()
+    try:
+        count = query_matches.append_range(start.isoformat(), end.isoformat(), store)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        store.close()
+    assert count == n_rows
+    return peak
+
+
+@pytest.mark.parametrize("small, large", [(4_000, 60_000)])
+def test_export_peak_memory_is_bounded_by_batch(monkeypatch, tmp_path, small, large):
+    small_peak = export_peak(monkeypatch, tmp_path, small)
+    large_peak = export_peak(monkeypatch, tmp_path, large)
+    assert large_peak <= small_peak * PEAK_TOLERANCE, (
+        f"peak grew from {small_peak / 1024 ** 2:.2f} MiB ({small} rows) "
+        f"to {large_peak / 1024 ** 2:.2f} MiB ({large} rows)"
+    )